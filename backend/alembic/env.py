@@ -16,6 +16,7 @@ from app.core.config import settings
 from app.core.database import Base
 # Import all models to ensure they are registered with Base
 from app.models import *
+from app.services.activity_log import is_partition
 
 # this is the Alembic Config object
 config = context.config
@@ -31,6 +32,14 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Partitions are created and dropped at runtime by the activity log
+    # maintenance task; autogenerate must not propose dropping them.
+    if type_ == "table" and reflected and compare_to is None and is_partition(name):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -49,6 +58,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -56,7 +66,7 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,47 @@
+"""Add auth_tokens table and drop plaintext reset tokens
+
+Revision ID: 3f1a9c2d7e41
+Revises: c6bec959a2da
+Create Date: 2026-10-18 09:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2d7e41'
+down_revision = 'c6bec959a2da'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'auth_tokens',
+        sa.Column('token_hash', sa.String(length=64), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('purpose', sa.Enum('PASSWORD_RESET', 'EMAIL_VERIFICATION', name='tokenpurpose'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('token_hash'),
+    )
+    op.create_index('ix_auth_tokens_expires_at', 'auth_tokens', ['expires_at'], unique=False)
+    op.create_index('ix_auth_tokens_user_id_purpose', 'auth_tokens', ['user_id', 'purpose'], unique=False)
+
+    # Outstanding plaintext reset links are invalidated; users can request a new one.
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('reset_token_expires')
+        batch_op.drop_column('reset_token')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('reset_token', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('reset_token_expires', sa.DateTime(), nullable=True))
+
+    op.drop_index('ix_auth_tokens_user_id_purpose', table_name='auth_tokens')
+    op.drop_index('ix_auth_tokens_expires_at', table_name='auth_tokens')
+    op.drop_table('auth_tokens')
+    sa.Enum(name='tokenpurpose').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,64 @@
+"""Add oauth_identities table and drop users.google_id
+
+Revision ID: 8b2e5d4c1a07
+Revises: 3f1a9c2d7e41
+Create Date: 2026-10-18 09:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e5d4c1a07'
+down_revision = '3f1a9c2d7e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'oauth_identities',
+        sa.Column('provider', sa.String(), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('provider', 'subject'),
+    )
+    op.create_index('ix_oauth_identities_user_id', 'oauth_identities', ['user_id'], unique=False)
+
+    # google_id held Google *and* GitHub account IDs; oauth_provider says which.
+    op.execute(
+        """
+        INSERT INTO oauth_identities (provider, subject, user_id, created_at)
+        SELECT COALESCE(oauth_provider, 'google'), google_id, id, created_at
+        FROM users
+        WHERE google_id IS NOT NULL
+        """
+    )
+
+    op.drop_index('ix_users_google_id', table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('google_id')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('google_id', sa.String(), nullable=True))
+    op.create_index('ix_users_google_id', 'users', ['google_id'], unique=True)
+
+    # Only one provider account per user fits in google_id; keep the newest.
+    op.execute(
+        """
+        UPDATE users SET google_id = (
+            SELECT subject FROM oauth_identities
+            WHERE oauth_identities.user_id = users.id
+            ORDER BY created_at DESC
+            LIMIT 1
+        )
+        """
+    )
+
+    op.drop_index('ix_oauth_identities_user_id', table_name='oauth_identities')
+    op.drop_table('oauth_identities')
@@ -0,0 +1,24 @@
+"""Add last_seen_at to users
+
+Revision ID: 5c7d3e9f2b18
+Revises: 8b2e5d4c1a07
+Create Date: 2026-10-18 10:00:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c7d3e9f2b18'
+down_revision = '8b2e5d4c1a07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'last_seen_at')
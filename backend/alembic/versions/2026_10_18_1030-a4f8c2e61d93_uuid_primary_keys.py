@@ -0,0 +1,118 @@
+"""Store primary and foreign keys as native UUIDs
+
+Revision ID: a4f8c2e61d93
+Revises: 5c7d3e9f2b18
+Create Date: 2026-10-18 10:30:00.000000+00:00
+
+Existing keys keep their (random, version 4) values; new rows get UUIDv7.
+PostgreSQL converts the varchar columns to uuid in place. SQLite keys
+become 16-byte blobs, converted row by row since SQLite has no uuid parsing.
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4f8c2e61d93'
+down_revision = '5c7d3e9f2b18'
+branch_labels = None
+depends_on = None
+
+
+PRIMARY_KEYS = [
+    'users',
+    'organizations',
+    'organization_members',
+    'subscriptions',
+    'invoices',
+    'payment_methods',
+]
+
+# (table, column, referenced table, ondelete)
+FOREIGN_KEYS = [
+    ('organizations', 'owner_id', 'users', None),
+    ('organization_members', 'organization_id', 'organizations', None),
+    ('organization_members', 'user_id', 'users', None),
+    ('subscriptions', 'user_id', 'users', None),
+    ('invoices', 'subscription_id', 'subscriptions', None),
+    ('payment_methods', 'user_id', 'users', None),
+    ('auth_tokens', 'user_id', 'users', 'CASCADE'),
+    ('oauth_identities', 'user_id', 'users', 'CASCADE'),
+]
+
+KEY_COLUMNS = [(table, 'id') for table in PRIMARY_KEYS] + [(table, column) for table, column, _, _ in FOREIGN_KEYS]
+
+
+def _drop_foreign_keys() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, column, _, _ in FOREIGN_KEYS:
+        for foreign_key in inspector.get_foreign_keys(table):
+            if foreign_key['constrained_columns'] == [column] and foreign_key['name']:
+                op.drop_constraint(foreign_key['name'], table, type_='foreignkey')
+
+
+def _create_foreign_keys() -> None:
+    for table, column, referenced, ondelete in FOREIGN_KEYS:
+        op.create_foreign_key(
+            f'{table}_{column}_fkey', table, referenced, [column], ['id'], ondelete=ondelete
+        )
+
+
+def _convert_sqlite_values(to_blob: bool) -> None:
+    bind = op.get_bind()
+    for table, column in KEY_COLUMNS:
+        rows = bind.execute(sa.text(f'SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL')).fetchall()
+        updates = []
+        for (value,) in rows:
+            if to_blob:
+                text_value = value.decode() if isinstance(value, bytes) else value
+                if len(text_value) == 36:
+                    updates.append({'old': value, 'new': uuid.UUID(text_value).bytes})
+            elif isinstance(value, bytes) and len(value) == 16:
+                updates.append({'old': value, 'new': str(uuid.UUID(bytes=value))})
+        if updates:
+            bind.execute(sa.text(f'UPDATE {table} SET {column} = :new WHERE {column} = :old'), updates)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        _drop_foreign_keys()
+        for table, column in KEY_COLUMNS:
+            op.alter_column(
+                table, column,
+                type_=sa.Uuid(),
+                existing_type=sa.String(),
+                postgresql_using=f'{column}::uuid',
+            )
+        _create_foreign_keys()
+        return
+
+    for table in PRIMARY_KEYS + ['auth_tokens', 'oauth_identities']:
+        with op.batch_alter_table(table) as batch_op:
+            for key_table, column in KEY_COLUMNS:
+                if key_table == table:
+                    batch_op.alter_column(column, type_=sa.LargeBinary(16), existing_type=sa.String())
+    _convert_sqlite_values(to_blob=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        _drop_foreign_keys()
+        for table, column in KEY_COLUMNS:
+            op.alter_column(
+                table, column,
+                type_=sa.String(),
+                existing_type=sa.Uuid(),
+                postgresql_using=f'{column}::text',
+            )
+        _create_foreign_keys()
+        return
+
+    _convert_sqlite_values(to_blob=False)
+    for table in PRIMARY_KEYS + ['auth_tokens', 'oauth_identities']:
+        with op.batch_alter_table(table) as batch_op:
+            for key_table, column in KEY_COLUMNS:
+                if key_table == table:
+                    batch_op.alter_column(column, type_=sa.String(), existing_type=sa.LargeBinary(16))
@@ -0,0 +1,77 @@
+"""Add indexes for foreign keys and common access paths
+
+Revision ID: d2b7e4a9c315
+Revises: a4f8c2e61d93
+Create Date: 2026-10-18 11:00:00.000000+00:00
+
+On PostgreSQL the indexes are built CONCURRENTLY so writes to the tables
+are not blocked while they build.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b7e4a9c315'
+down_revision = 'a4f8c2e61d93'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, partial index condition)
+INDEXES = [
+    ('ix_organizations_owner_id', 'organizations', ['owner_id'], None),
+    ('ix_organization_members_user_id', 'organization_members', ['user_id'], None),
+    ('ix_payment_methods_user_id', 'payment_methods', ['user_id'], None),
+    ('ix_invoices_subscription_id_created_at', 'invoices', ['subscription_id', 'created_at'], None),
+    ('ix_subscriptions_status_current_period_end', 'subscriptions', ['status', 'current_period_end'], None),
+    ('ix_users_verification_token', 'users', ['verification_token'], 'verification_token IS NOT NULL'),
+]
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    # Keep the earliest row of any duplicated membership before enforcing uniqueness
+    if is_postgresql:
+        op.execute(
+            """
+            DELETE FROM organization_members a
+            USING organization_members b
+            WHERE a.organization_id = b.organization_id
+              AND a.user_id = b.user_id
+              AND a.ctid > b.ctid
+            """
+        )
+    else:
+        op.execute(
+            """
+            DELETE FROM organization_members WHERE rowid NOT IN (
+                SELECT MIN(rowid) FROM organization_members GROUP BY organization_id, user_id
+            )
+            """
+        )
+    with op.batch_alter_table('organization_members') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_organization_members_organization_id_user_id', ['organization_id', 'user_id']
+        )
+
+    if is_postgresql:
+        with op.get_context().autocommit_block():
+            for name, table, columns, where in INDEXES:
+                op.create_index(
+                    name, table, columns,
+                    postgresql_concurrently=True,
+                    postgresql_where=sa.text(where) if where else None,
+                )
+    else:
+        for name, table, columns, where in INDEXES:
+            op.create_index(name, table, columns, sqlite_where=sa.text(where) if where else None)
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+
+    with op.batch_alter_table('organization_members') as batch_op:
+        batch_op.drop_constraint('uq_organization_members_organization_id_user_id', type_='unique')
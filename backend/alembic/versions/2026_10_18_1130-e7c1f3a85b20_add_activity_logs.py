@@ -0,0 +1,74 @@
+"""Add activity_logs, partitioned by month on PostgreSQL
+
+Revision ID: e7c1f3a85b20
+Revises: d2b7e4a9c315
+Create Date: 2026-10-18 11:30:00.000000+00:00
+
+The partitioned parent gets a DEFAULT partition and partitions for the
+current and next month; the app keeps creating future months and dropping
+expired ones (app.services.activity_log.maintain_log_storage).
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c1f3a85b20'
+down_revision = 'd2b7e4a9c315'
+branch_labels = None
+depends_on = None
+
+
+def _months(count: int):
+    now = datetime.utcnow()
+    for offset in range(count):
+        index = now.year * 12 + now.month - 1 + offset
+        yield datetime(index // 12, index % 12 + 1, 1), datetime((index + 1) // 12, (index + 1) % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+    key = sa.Uuid() if is_postgresql else sa.LargeBinary(16)
+    details = postgresql.JSONB() if is_postgresql else sa.JSON()
+    partitioning = {'postgresql_partition_by': 'RANGE (created_at)'} if is_postgresql else {}
+
+    op.create_table(
+        'activity_logs',
+        sa.Column('id', key, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('organization_id', key, nullable=True),
+        sa.Column('user_id', key, nullable=True),
+        sa.Column('action_type', sa.String(length=100), nullable=False),
+        sa.Column('action_description', sa.String(), nullable=True),
+        sa.Column('resource_type', sa.String(length=100), nullable=True),
+        sa.Column('resource_id', sa.String(), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.String(), nullable=True),
+        sa.Column('metadata', details, nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        **partitioning,
+    )
+    op.create_index('ix_activity_logs_organization_id_created_at', 'activity_logs', ['organization_id', 'created_at'])
+    op.create_index('ix_activity_logs_user_id_created_at', 'activity_logs', ['user_id', 'created_at'])
+    op.create_index('ix_activity_logs_created_at', 'activity_logs', ['created_at'])
+
+    if is_postgresql:
+        op.execute('CREATE TABLE activity_logs_default PARTITION OF activity_logs DEFAULT')
+        for start, end in _months(2):
+            op.execute(
+                f"CREATE TABLE activity_logs_{start:%Y_%m} PARTITION OF activity_logs "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            )
+
+
+def downgrade() -> None:
+    # Dropping a partitioned table drops its partitions
+    op.drop_index('ix_activity_logs_created_at', table_name='activity_logs')
+    op.drop_index('ix_activity_logs_user_id_created_at', table_name='activity_logs')
+    op.drop_index('ix_activity_logs_organization_id_created_at', table_name='activity_logs')
+    op.drop_table('activity_logs')
@@ -0,0 +1,40 @@
+"""Add (created_at, id) indexes for keyset pagination
+
+Revision ID: f3d9a6b1c742
+Revises: e7c1f3a85b20
+Create Date: 2026-10-18 12:00:00.000000+00:00
+
+The invoice index gains id so the (created_at, id) row comparison is an
+index range scan. On PostgreSQL the indexes are built CONCURRENTLY.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3d9a6b1c742'
+down_revision = 'e7c1f3a85b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_bind().dialect.name == 'postgresql'
+
+    if is_postgresql:
+        with op.get_context().autocommit_block():
+            op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], postgresql_concurrently=True)
+            op.create_index(
+                'ix_invoices_subscription_id_created_at_id', 'invoices', ['subscription_id', 'created_at', 'id'],
+                postgresql_concurrently=True,
+            )
+            op.drop_index('ix_invoices_subscription_id_created_at', table_name='invoices', postgresql_concurrently=True)
+    else:
+        op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+        op.create_index('ix_invoices_subscription_id_created_at_id', 'invoices', ['subscription_id', 'created_at', 'id'])
+        op.drop_index('ix_invoices_subscription_id_created_at', table_name='invoices')
+
+
+def downgrade() -> None:
+    op.create_index('ix_invoices_subscription_id_created_at', 'invoices', ['subscription_id', 'created_at'])
+    op.drop_index('ix_invoices_subscription_id_created_at_id', table_name='invoices')
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -1,27 +1,43 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, status, Depends, Query
 from fastapi.responses import RedirectResponse
-from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
+from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import update
 from datetime import datetime, timedelta
+from typing import Optional
+import logging
 from app.schemas.auth import (
     UserRegister,
     UserLogin,
     TokenResponse,
+    RefreshTokenRequest,
     PasswordReset,
     PasswordResetConfirm
 )
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    hash_password_async,
+    password_needs_rehash,
     create_access_token,
     create_refresh_token,
-    generate_reset_token
+    decode_token,
+    evict_token,
+    new_token_id
 )
-from app.core.database import get_db
+from app.core.database import get_db, pin_user, AsyncSessionLocal
+from app.core.principal import invalidate_principal
+from app.core.token_store import token_family_store, RotationResult
+from app.core.revocation import revocation_list
+from app.core.rate_limit import login_limiter
+from app.core.client_ip import client_ip
 from app.models.user import User
+from app.models.auth_token import TokenPurpose
+from app.services.auth_tokens import issue_auth_token, get_auth_token
+from app.services.accounts import link_oauth_account
+from app.services.queries import PRINCIPAL_BY_EMAIL, user_by_email, user_id_by_email
+from app.services.touch_buffer import touch_buffer
+from app.services.activity_log import activity_log
+from app.api.endpoints.users import get_current_user_from_token, oauth2_scheme
 from app.core.email import (
     send_email,
     generate_password_reset_email,
@@ -40,6 +56,46 @@ from app.core.github_oauth import (
 )
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+async def create_token_pair(email: str) -> dict:
+    """
+    Create an access token and the first refresh token of a new token family.
+    """
+    family_id = new_token_id()
+    token_id = new_token_id()
+    await token_family_store.create_family(
+        family_id,
+        token_id,
+        settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+        email,
+    )
+
+    return {
+        "access_token": create_access_token(data={"sub": email}),
+        "refresh_token": create_refresh_token(data={"sub": email}, family_id=family_id, token_id=token_id),
+        "token_type": "bearer"
+    }
+
+async def rehash_password(user_id: str, old_hash: str, password: str) -> None:
+    """
+    Replace a user's password hash with one using the current scheme and cost.
+
+    The update only applies if the stored hash is still the one that was
+    verified, so a concurrent password change is never overwritten.
+    """
+    try:
+        new_hash = await hash_password_async(password)
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == old_hash)
+                .values(hashed_password=new_hash)
+            )
+            await session.commit()
+    except Exception as e:
+        logger.warning(f"Could not rehash password for user {user_id}: {e}")
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
@@ -47,9 +103,7 @@ async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     Register a new user.
     """
     # Check if user already exists
-    result = await db.execute(
-        select(User).where(User.email == user_data.email)
-    )
+    result = await db.execute(user_id_by_email(user_data.email))
     existing_user = result.scalar_one_or_none()
 
     if existing_user:
@@ -59,7 +113,7 @@ async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
         )
 
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     new_user = User(
         email=user_data.email,
         full_name=user_data.full_name,
@@ -70,31 +124,40 @@ async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     )
 
     db.add(new_user)
+    # The client's next request carries the new token; serve it from the primary
+    pin_user(db, new_user.email)
     await db.commit()
     await db.refresh(new_user)
+    activity_log.log_activity("user.register", user_id=new_user.id)
 
-    # Create tokens
-    access_token = create_access_token(data={"sub": new_user.email})
-    refresh_token = create_refresh_token(data={"sub": new_user.email})
-
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer"
-    }
+    return await create_token_pair(new_user.email)
 
 @router.post("/login", response_model=TokenResponse)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+async def login(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
     """
     Login user and return JWT tokens.
     """
+    # Shed excess attempts before any database or password work
+    ip = client_ip(request)
+    retry_after = await login_limiter.admit(form_data.username, ip)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Please try again later.",
+            headers={"Retry-After": str(int(retry_after))},
+        )
+
     # Find user by email (username field is used for email)
-    result = await db.execute(
-        select(User).where(User.email == form_data.username)
-    )
+    result = await db.execute(user_by_email(form_data.username))
     user = result.scalar_one_or_none()
 
     if not user:
+        await login_limiter.record_failure(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -102,7 +165,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
         )
 
     # Verify password
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
+        await login_limiter.record_failure(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -116,34 +180,92 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
             detail="User account is inactive"
         )
 
-    # Create tokens
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.email})
+    await login_limiter.record_success(form_data.username)
+    touch_buffer.touch(user.id, "last_login")
+    activity_log.log_activity(
+        "user.login",
+        user_id=user.id,
+        ip_address=ip,
+        user_agent=request.headers.get("user-agent"),
+    )
 
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer"
-    }
+    # Upgrade hashes made with an outdated scheme or cost after responding
+    if password_needs_rehash(user.hashed_password):
+        background_tasks.add_task(rehash_password, user.id, user.hashed_password, form_data.password)
+
+    return await create_token_pair(user.email)
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(refresh_token: str):
+async def refresh_token(data: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
     """
     Refresh access token using refresh token.
+
+    The refresh token is rotated: the presented token is consumed and a new
+    one from the same family is returned. Presenting an already used refresh
+    token revokes the whole family. The family expires REFRESH_TOKEN_EXPIRE_DAYS
+    after login however often it is rotated, and deleted or inactive users
+    can't refresh.
     """
-    # TODO: Implement token refresh logic
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Token refresh not implemented yet"
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
 
+    payload = decode_token(data.refresh_token)
+    if not payload or payload.get("type") != "refresh":
+        raise credentials_exception
+
+    email = payload.get("sub")
+    token_id = payload.get("jti")
+    family_id = payload.get("fam")
+    if not email or not token_id or not family_id:
+        raise credentials_exception
+
+    user = (await db.execute(PRINCIPAL_BY_EMAIL, {"email": email})).one_or_none()
+    if user is None or not user.is_active:
+        await token_family_store.revoke_family(family_id)
+        raise credentials_exception
+
+    next_token_id = new_token_id()
+    result = await token_family_store.rotate(family_id, token_id, next_token_id)
+
+    if result == RotationResult.REUSED:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has already been used. Please log in again.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if result != RotationResult.ROTATED:
+        raise credentials_exception
+
+    return {
+        "access_token": create_access_token(data={"sub": email}),
+        "refresh_token": create_refresh_token(data={"sub": email}, family_id=family_id, token_id=next_token_id),
+        "token_type": "bearer"
+    }
+
 @router.post("/logout")
-async def logout():
+async def logout(
+    data: Optional[RefreshTokenRequest] = None,
+    token: str = Depends(oauth2_scheme)
+):
     """
     Logout user (invalidate tokens).
+
+    The access token is revoked until it expires. If the refresh token is
+    sent as well, its whole token family is revoked.
     """
-    # TODO: Implement logout logic
-    # - Add token to blacklist in Redis
+    payload = decode_token(token)
+    if payload and payload.get("type") == "access":
+        await revocation_list.revoke(payload)
+        evict_token(token)
+
+    if data is not None:
+        refresh_payload = decode_token(data.refresh_token)
+        if refresh_payload and refresh_payload.get("type") == "refresh" and refresh_payload.get("fam"):
+            await token_family_store.revoke_family(refresh_payload["fam"])
+
     return {"message": "Successfully logged out"}
 
 @router.post("/forgot-password")
@@ -152,9 +274,7 @@ async def forgot_password(data: PasswordReset, db: AsyncSession = Depends(get_db
     Send password reset email to the user.
     """
     # Find user by email
-    result = await db.execute(
-        select(User).where(User.email == data.email)
-    )
+    result = await db.execute(user_by_email(data.email))
     user = result.scalar_one_or_none()
 
     if not user:
@@ -164,15 +284,17 @@ async def forgot_password(data: PasswordReset, db: AsyncSession = Depends(get_db
             detail="No account found with this email address. Please check your email or register for a new account."
         )
 
-    # Generate reset token
-    reset_token = generate_reset_token()
-    reset_token_expires = datetime.utcnow() + timedelta(hours=1)
-
-    # Update user with reset token
-    user.reset_token = reset_token
-    user.reset_token_expires = reset_token_expires
+    # Generate reset token (only its hash is stored)
+    reset_token = await issue_auth_token(
+        db,
+        user.id,
+        TokenPurpose.PASSWORD_RESET,
+        timedelta(hours=1),
+    )
     await db.commit()
 
+    success_message = {"message": "Password reset link has been sent to your email."}
+
     # Generate reset link
     reset_link = f"{settings.FRONTEND_URL}/auth/reset-password?token={reset_token}"
 
@@ -216,11 +338,9 @@ async def reset_password(data: PasswordResetConfirm, db: AsyncSession = Depends(
     """
     Reset password using the token received via email.
     """
-    # Find user by reset token
-    result = await db.execute(
-        select(User).where(User.reset_token == data.token)
-    )
-    user = result.scalar_one_or_none()
+    # Find reset token by its hash
+    auth_token = await get_auth_token(db, data.token, TokenPurpose.PASSWORD_RESET)
+    user = await db.get(User, auth_token.user_id) if auth_token else None
 
     if not user:
         raise HTTPException(
@@ -229,19 +349,21 @@ async def reset_password(data: PasswordResetConfirm, db: AsyncSession = Depends(
         )
 
     # Check if token has expired
-    if not user.reset_token_expires or user.reset_token_expires < datetime.utcnow():
+    if auth_token.expires_at < datetime.utcnow():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Reset token has expired. Please request a new password reset."
         )
 
-    # Update password
-    user.hashed_password = get_password_hash(data.new_password)
-    user.reset_token = None
-    user.reset_token_expires = None
+    # Update password and consume the token
+    user.hashed_password = await hash_password_async(data.new_password)
     user.updated_at = datetime.utcnow()
+    await db.delete(auth_token)
 
     await db.commit()
+    # Sessions started with the old password end
+    await token_family_store.revoke_subject(user.email)
+    activity_log.log_activity("user.password_reset", user_id=user.id)
 
     # Send confirmation email
     html_content = generate_password_reset_success_email(user.full_name)
@@ -301,54 +423,24 @@ async def google_callback(
             detail="Failed to verify Google token"
         )
 
-    # Check if user exists by Google ID
-    result = await db.execute(
-        select(User).where(User.google_id == user_info["google_id"])
+    # Find, link or create the user in one round trip
+    account = await link_oauth_account(
+        db,
+        provider="google",
+        subject=user_info["google_id"],
+        email=user_info["email"],
+        full_name=user_info["full_name"],
+        profile_picture=user_info.get("profile_picture"),
     )
-    user = result.scalar_one_or_none()
-
-    # If no user by Google ID, check by email
-    if not user:
-        result = await db.execute(
-            select(User).where(User.email == user_info["email"])
-        )
-        user = result.scalar_one_or_none()
-
-        if user:
-            # User exists with this email but not linked to Google yet
-            # Link the Google account
-            user.google_id = user_info["google_id"]
-            user.oauth_provider = "google"
-            if not user.profile_picture and user_info.get("profile_picture"):
-                user.profile_picture = user_info["profile_picture"]
-            user.is_verified = True
-            await db.commit()
-        else:
-            # Create new user
-            user = User(
-                email=user_info["email"],
-                full_name=user_info["full_name"],
-                google_id=user_info["google_id"],
-                oauth_provider="google",
-                profile_picture=user_info.get("profile_picture"),
-                hashed_password=None,  # No password for OAuth users
-                is_active=True,
-                is_verified=True  # Google accounts are pre-verified
-            )
-            db.add(user)
-            await db.commit()
-            await db.refresh(user)
-
-    # Update last login
-    user.last_login = datetime.utcnow()
+    pin_user(db, account.email)
     await db.commit()
+    invalidate_principal(account.email)
 
     # Create tokens
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.email})
+    tokens = await create_token_pair(account.email)
 
     # Redirect to frontend with tokens
-    frontend_redirect = f"{settings.FRONTEND_URL}/auth/callback?access_token={access_token}&refresh_token={refresh_token}"
+    frontend_redirect = f"{settings.FRONTEND_URL}/auth/callback?access_token={tokens['access_token']}&refresh_token={tokens['refresh_token']}"
     return RedirectResponse(url=frontend_redirect)
 
 
@@ -386,59 +478,24 @@ async def github_callback(code: str, db: AsyncSession = Depends(get_db)):
             detail="Failed to get user info from GitHub. Please ensure your GitHub email is verified."
         )
 
-    github_id = user_info["id"]
-    email = user_info["email"]
-    full_name = user_info["name"]
-    profile_picture = user_info.get("avatar_url")
-
-    # Check if user exists by GitHub ID
-    result = await db.execute(
-        select(User).where(User.google_id == github_id)  # We'll reuse google_id field
+    # Find, link or create the user in one round trip
+    account = await link_oauth_account(
+        db,
+        provider="github",
+        subject=user_info["id"],
+        email=user_info["email"],
+        full_name=user_info["name"],
+        profile_picture=user_info.get("avatar_url"),
     )
-    user = result.scalar_one_or_none()
-
-    # If no user by GitHub ID, check by email
-    if not user:
-        result = await db.execute(
-            select(User).where(User.email == email)
-        )
-        user = result.scalar_one_or_none()
-
-        if user:
-            # User exists with this email but not linked to GitHub yet
-            # Link the GitHub account
-            user.google_id = github_id  # Reusing google_id field
-            user.oauth_provider = "github"
-            if not user.profile_picture and profile_picture:
-                user.profile_picture = profile_picture
-            user.is_verified = True
-            await db.commit()
-        else:
-            # Create new user
-            user = User(
-                email=email,
-                full_name=full_name,
-                google_id=github_id,  # Reusing google_id field
-                oauth_provider="github",
-                profile_picture=profile_picture,
-                hashed_password=None,  # No password for OAuth users
-                is_active=True,
-                is_verified=True  # GitHub accounts are pre-verified
-            )
-            db.add(user)
-            await db.commit()
-            await db.refresh(user)
-
-    # Update last login
-    user.last_login = datetime.utcnow()
+    pin_user(db, account.email)
     await db.commit()
+    invalidate_principal(account.email)
 
     # Create tokens
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.email})
+    tokens = await create_token_pair(account.email)
 
     # Redirect to frontend with tokens
-    frontend_redirect = f"{settings.FRONTEND_URL}/auth/callback?access_token={access_token}&refresh_token={refresh_token}"
+    frontend_redirect = f"{settings.FRONTEND_URL}/auth/callback?access_token={tokens['access_token']}&refresh_token={tokens['refresh_token']}"
     return RedirectResponse(url=frontend_redirect)
 
 
@@ -446,22 +503,9 @@ async def github_callback(code: str, db: AsyncSession = Depends(get_db)):
 
 @router.post("/2fa/setup")
 async def setup_2fa(
-    db: AsyncSession = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: User = Depends(get_current_user_from_token),
+    db: AsyncSession = Depends(get_db)
 ):
-    from app.core.security import decode_token
-    from fastapi.security import OAuth2PasswordBearer
-
-    # Get current user from token
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    email = payload.get("sub")
-    result = await db.execute(select(User).where(User.email == email))
-    current_user = result.scalar_one_or_none()
-    if not current_user:
-        raise HTTPException(status_code=401, detail="User not found")
     """
     Generate a new 2FA secret and QR code for the user.
     """
@@ -496,6 +540,7 @@ async def setup_2fa(
     # Store the secret temporarily (will be confirmed when verified)
     current_user.two_factor_secret = secret
     await db.commit()
+    invalidate_principal(current_user.email)
 
     return {
         "qr_code": qr_code_data,
@@ -507,21 +552,9 @@ async def setup_2fa(
 @router.post("/2fa/verify")
 async def verify_2fa(
     request_data: dict,
-    db: AsyncSession = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: User = Depends(get_current_user_from_token),
+    db: AsyncSession = Depends(get_db)
 ):
-    from app.core.security import decode_token
-
-    # Get current user from token
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    email = payload.get("sub")
-    result = await db.execute(select(User).where(User.email == email))
-    current_user = result.scalar_one_or_none()
-    if not current_user:
-        raise HTTPException(status_code=401, detail="User not found")
     """
     Verify the 2FA code and enable 2FA for the user.
     """
@@ -546,6 +579,8 @@ async def verify_2fa(
     # Enable 2FA
     current_user.two_factor_enabled = True
     await db.commit()
+    invalidate_principal(current_user.email)
+    activity_log.log_activity("user.2fa_enable", user_id=current_user.id)
 
     return {
         "message": "Two-factor authentication enabled successfully",
@@ -555,21 +590,9 @@ async def verify_2fa(
 
 @router.post("/2fa/disable")
 async def disable_2fa(
-    db: AsyncSession = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: User = Depends(get_current_user_from_token),
+    db: AsyncSession = Depends(get_db)
 ):
-    from app.core.security import decode_token
-
-    # Get current user from token
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    email = payload.get("sub")
-    result = await db.execute(select(User).where(User.email == email))
-    current_user = result.scalar_one_or_none()
-    if not current_user:
-        raise HTTPException(status_code=401, detail="User not found")
     """
     Disable 2FA for the user.
     """
@@ -583,6 +606,8 @@ async def disable_2fa(
     current_user.two_factor_enabled = False
     current_user.two_factor_secret = None
     await db.commit()
+    invalidate_principal(current_user.email)
+    activity_log.log_activity("user.2fa_disable", user_id=current_user.id)
 
     return {
         "message": "Two-factor authentication disabled successfully",
@@ -1,6 +1,14 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.billing import Subscription, Invoice, PaymentMethod
+from app.schemas.pagination import Page
+from app.core.database import get_read_db
+from app.core.pagination import InvalidCursorError, paginate
+from app.core.principal import Principal
+from app.models.subscription import Invoice as InvoiceModel, Subscription as SubscriptionModel
+from app.api.endpoints.users import get_current_principal
 
 router = APIRouter()
 
@@ -34,13 +42,25 @@ async def cancel_subscription():
     # TODO: Implement subscription cancellation
     return {"message": "Subscription cancelled successfully"}
 
-@router.get("/invoices", response_model=List[Invoice])
-async def list_invoices(skip: int = 0, limit: int = 100):
-    """
-    List all invoices.
-    """
-    # TODO: Implement list invoices logic
-    return []
+@router.get("/invoices", response_model=Page[Invoice])
+async def list_invoices(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    List the current user's invoices, newest first.
+    """
+    stmt = (
+        select(InvoiceModel)
+        .join(SubscriptionModel, SubscriptionModel.id == InvoiceModel.subscription_id)
+        .where(SubscriptionModel.user_id == principal.id)
+    )
+    try:
+        return await paginate(db, stmt, InvoiceModel, cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/invoices/{invoice_id}", response_model=Invoice)
 async def get_invoice(invoice_id: str):
@@ -1,6 +1,19 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.organization import Organization, OrganizationCreate, OrganizationUpdate
+from app.schemas.activity import ActivityLog
+from app.schemas.pagination import Page
+from app.core.database import get_read_db
+from app.core.principal import Principal
+from app.models.organization import Organization as OrganizationModel, OrganizationMember
+from app.models.user import UserRole
+from app.core.pagination import InvalidCursorError, paginate
+from app.services.activity_log import activity_query, query_window
+from app.api.endpoints.users import get_current_principal
 
 router = APIRouter()
 
@@ -15,13 +28,25 @@ async def create_organization(org_data: OrganizationCreate):
         detail="Organization creation not implemented yet"
     )
 
-@router.get("/", response_model=List[Organization])
-async def list_organizations(skip: int = 0, limit: int = 100):
+@router.get("/", response_model=Page[Organization])
+async def list_organizations(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
-    List user's organizations.
+    List user's organizations, newest first.
     """
-    # TODO: Implement list organizations logic
-    return []
+    stmt = (
+        select(OrganizationModel)
+        .join(OrganizationMember, OrganizationMember.organization_id == OrganizationModel.id)
+        .where(OrganizationMember.user_id == principal.id)
+    )
+    try:
+        return await paginate(db, stmt, OrganizationModel, cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/{org_id}", response_model=Organization)
 async def get_organization(org_id: str):
@@ -68,3 +93,43 @@ async def remove_member(org_id: str, user_id: str):
     """
     # TODO: Implement remove member logic
     return {"message": "Member removed successfully"}
+
+@router.get("/{org_id}/activity", response_model=List[ActivityLog])
+async def list_activity(
+    org_id: UUID,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    action_type: Optional[str] = None,
+    user_id: Optional[UUID] = None,
+    limit: int = Query(50, ge=1, le=200),
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get activity logs for an organization, newest first.
+
+    Only the partitions overlapping the [since, until) window (default: the
+    last 30 days) are scanned.
+    """
+    try:
+        since, until = query_window(since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if principal.role != UserRole.ADMIN:
+        membership = await db.execute(
+            select(OrganizationMember.id).where(
+                OrganizationMember.organization_id == org_id,
+                OrganizationMember.user_id == principal.id,
+            )
+        )
+        if membership.first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Organization not found"
+            )
+
+    result = await db.execute(
+        activity_query(since, until, organization_id=org_id, user_id=user_id, action_type=action_type, limit=limit)
+    )
+    return result.scalars().all()
@@ -1,24 +1,35 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Query
 from fastapi.security import OAuth2PasswordBearer
-from typing import List
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.schemas.user import User, UserUpdate, UserProfileUpdate, PasswordChange
-from app.core.database import get_db
-from app.core.security import decode_token, verify_password, get_password_hash
-from app.models.user import User as UserModel
+from app.core.database import get_db, get_read_db
+from app.core.security import decode_token, verify_password_async, hash_password_async
+from app.models.user import User as UserModel, UserRole
 from app.core.upload import save_profile_picture, delete_profile_picture
+from app.core.principal import Principal, principal_cache, invalidate_principal
+from app.core.revocation import revocation_list
+from app.core.token_store import token_family_store
+from app.services.touch_buffer import touch_buffer
+from app.services.activity_log import activity_log
+from app.services.queries import PRINCIPAL_BY_EMAIL
+from app.core.pagination import InvalidCursorError, paginate
+from app.schemas.pagination import Page
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def get_current_user_from_token(
+async def get_current_principal(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> UserModel:
+    db: AsyncSession = Depends(get_read_db)
+) -> Principal:
     """
-    Dependency to get current user from JWT token.
+    Dependency to get the authenticated principal from JWT token.
+
+    The principal is served from the in-process cache; the database is only
+    queried on a cache miss.
     """
     payload = decode_token(token)
     if not payload:
@@ -29,17 +40,44 @@ async def get_current_user_from_token(
         )
 
     email: str = payload.get("sub")
-    if email is None:
+    if email is None or await revocation_list.is_revoked(payload):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    result = await db.execute(select(UserModel).where(UserModel.email == email))
-    user = result.scalar_one_or_none()
+    principal = principal_cache.get(email)
+    if principal is not None:
+        touch_buffer.touch(principal.id, "last_seen_at")
+        return principal
+
+    result = await db.execute(PRINCIPAL_BY_EMAIL, {"email": email})
+    row = result.one_or_none()
+
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    principal = Principal.from_row(row)
+    principal_cache.set(email, principal)
+    touch_buffer.touch(principal.id, "last_seen_at")
+    return principal
+
+async def get_current_user_from_token(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+) -> UserModel:
+    """
+    Dependency to get the full current user row, for handlers that modify it.
+    """
+    user = await db.get(UserModel, principal.id)
 
     if user is None:
+        invalidate_principal(principal.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
@@ -48,8 +86,19 @@ async def get_current_user_from_token(
 
     return user
 
+async def get_current_admin(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """
+    Dependency that only admits platform admins.
+    """
+    if principal.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return principal
+
 @router.get("/me", response_model=User)
-async def get_current_user(current_user: UserModel = Depends(get_current_user_from_token)):
+async def get_current_user(current_user: Principal = Depends(get_current_principal)):
     """
     Get current user profile.
     """
@@ -73,6 +122,7 @@ async def update_current_user(
     current_user.updated_at = datetime.utcnow()
 
     await db.commit()
+    invalidate_principal(current_user.email)
     await db.refresh(current_user)
 
     return current_user
@@ -98,6 +148,7 @@ async def upload_profile_picture(
     current_user.updated_at = datetime.utcnow()
 
     await db.commit()
+    invalidate_principal(current_user.email)
     await db.refresh(current_user)
 
     return current_user
@@ -116,6 +167,7 @@ async def delete_user_profile_picture(
         current_user.updated_at = datetime.utcnow()
 
         await db.commit()
+        invalidate_principal(current_user.email)
         await db.refresh(current_user)
 
     return current_user
@@ -137,24 +189,28 @@ async def change_password(
         )
 
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    if not await verify_password_async(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
 
     # Check that new password is different from current
-    if verify_password(password_data.new_password, current_user.hashed_password):
+    if await verify_password_async(password_data.new_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be different from current password"
         )
 
     # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    current_user.hashed_password = await hash_password_async(password_data.new_password)
     current_user.updated_at = datetime.utcnow()
 
     await db.commit()
+    invalidate_principal(current_user.email)
+    # Sessions started with the old password end
+    await token_family_store.revoke_subject(current_user.email)
+    activity_log.log_activity("user.password_change", user_id=current_user.id)
 
     return {"message": "Password changed successfully"}
 
@@ -177,11 +233,18 @@ async def get_user(user_id: str):
         detail="Get user not implemented yet"
     )
 
-@router.get("/", response_model=List[User])
-async def list_users(skip: int = 0, limit: int = 100):
+@router.get("/", response_model=Page[User])
+async def list_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    admin: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
-    List all users (admin only).
+    List all users, newest first (admin only).
     """
-    # TODO: Implement list users logic
-    return []
+    try:
+        return await paginate(db, select(UserModel), UserModel, cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -0,0 +1,44 @@
+"""
+Client address resolution behind reverse proxies.
+
+Behind a proxy ``request.client.host`` is the proxy, so every client would
+share one address. ``X-Forwarded-For`` is only believed when the request
+comes from a proxy listed in ``TRUSTED_PROXIES``; the header is then read
+from the right, skipping the trusted hops, because anything to the left of
+them was written by the client and can be forged.
+"""
+import ipaddress
+from typing import List, Union
+from fastapi import Request
+from app.core.config import settings
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(value: str) -> List[Network]:
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip()]
+
+
+trusted_proxies = parse_networks(settings.TRUSTED_PROXIES)
+
+
+def is_trusted(address: str, networks: List[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(request: Request, networks: List[Network] = trusted_proxies) -> str:
+    """The address of the client that sent ``request``."""
+    peer = request.client.host if request.client else "unknown"
+    if not is_trusted(peer, networks):
+        return peer
+
+    forwarded = ",".join(request.headers.getlist("x-forwarded-for"))
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not is_trusted(hop, networks):
+            return hop
+    return hops[0] if hops else peer
@@ -17,17 +17,100 @@ class Settings(BaseSettings):
     # CORS
     FRONTEND_URL: str = "http://localhost:3000"
 
+    # Reverse proxies whose X-Forwarded-For is trusted (comma-separated IPs/CIDRs)
+    TRUSTED_PROXIES: str = ""
+
     # Database
     DATABASE_URL: str
+    DATABASE_ECHO: bool = False  # log every SQL statement
+    DATABASE_REPLICA_URLS: str = ""  # comma-separated read replica URLs
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: int = 10
+    READ_YOUR_WRITES_SECONDS: int = 5
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: int = 30  # seconds to wait for a connection
+    DATABASE_POOL_RECYCLE: int = 1800  # seconds; -1 keeps connections forever
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_POOL_LIVENESS_INTERVAL_SECONDS: int = 0  # >0 replaces pre-ping with a background check
+    DATABASE_POOL_WARMUP_CONNECTIONS: int = 4  # opened per engine at startup
+    DATABASE_PREPARED_STATEMENT_CACHE_SIZE: int = 500  # per asyncpg connection; 0 disables
+    DATABASE_POOL_MODE: str = "direct"  # "direct" or "pgbouncer" (transaction pooling)
+    PGBOUNCER_CLIENT_POOL_SIZE: int = 0  # app-side pool in pgbouncer mode; 0 = NullPool
+    SCHEMA_VERSION_CHECK: str = "warn"  # "error", "warn" or "off"
+
+    # SQLite (file databases)
+    SQLITE_TUNED: bool = False  # WAL profile, single writer connection, pooled readers
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_READER_POOL_SIZE: int = 4
+
+    # SQL instrumentation
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_SLOW_QUERY_MS: int = 200  # slower SELECTs are logged with their EXPLAIN plan
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # same statement this often in one request
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
 
     # JWT
     JWT_SECRET_KEY: str
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: str = "HS256"  # HS256, or RS256/ES256 for signing with rotated key pairs
+    JWT_KEYS_DIR: str = "keys"
+    JWT_KEY_ROTATION_DAYS: int = 30
+    JWT_KEY_PUBLISH_AHEAD_HOURS: int = 24
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_CACHE_MAX_SIZE: int = 50000
+    TOKEN_STORE_BACKEND: str = ""  # 'redis' or 'memory'; unset: 'memory' in development, else 'redis'
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+
+    # Password hashing
+    # Tune the cost on the deployment host with scripts/calibrate_password_hash.py
+    PASSWORD_HASH_SCHEME: str = "bcrypt"  # 'bcrypt' or 'argon2' (requires argon2-cffi)
+    PASSWORD_HASH_TARGET_MS: int = 250
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 2
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # 'thread' or 'process'
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
+    # Password reset / email verification tokens
+    AUTH_TOKEN_SWEEP_INTERVAL_SECONDS: int = 3600
+    AUTH_TOKEN_SWEEP_BATCH_SIZE: int = 1000
+
+    # Login rate limiting
+    RATE_LIMIT_BACKEND: str = ""  # 'redis' or 'memory'; unset: 'memory' in development, else 'redis'
+    LOGIN_RATE_LIMIT_ACCOUNT_PER_MINUTE: int = 10
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: int = 30
+    LOGIN_LOCKOUT_THRESHOLD: int = 5
+    LOGIN_LOCKOUT_BASE_SECONDS: int = 30
+    LOGIN_LOCKOUT_MAX_SECONDS: int = 3600
+
+    # Buffered last_login / last_seen_at updates
+    TOUCH_FLUSH_INTERVAL_SECONDS: int = 10
+    TOUCH_BUFFER_MAX_PENDING: int = 50000
+    TOUCH_BUFFER_MAX_SIZE: int = 500000  # touches beyond this are dropped while writes fail
+
+    # Activity logs (buffered, monthly partitions on PostgreSQL)
+    ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS: int = 5
+    ACTIVITY_LOG_BUFFER_MAX_PENDING: int = 5000  # flush early at this many queued events
+    ACTIVITY_LOG_BUFFER_MAX_SIZE: int = 100000  # oldest events are dropped beyond this while writes fail
+    ACTIVITY_LOG_INSERT_BATCH_SIZE: int = 1000  # rows per multi-row INSERT
+    ACTIVITY_LOG_PARTITIONS_AHEAD: int = 2  # future monthly partitions kept ready
+    ACTIVITY_LOG_RETENTION_MONTHS: int = 12  # older partitions are dropped; 0 keeps everything
+    ACTIVITY_LOG_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    ACTIVITY_LOG_MAX_QUERY_DAYS: int = 92  # widest created_at window one query may scan
+
+    # Authenticated principal cache
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_PREFILL: int = 0  # recently seen users loaded at startup
 
     # Email
     SMTP_HOST: str = "smtp.gmail.com"
@@ -41,15 +124,26 @@ class Settings(BaseSettings):
     STRIPE_API_KEY: str = ""
     STRIPE_WEBHOOK_SECRET: str = ""
 
+    # Outbound HTTP client (OAuth providers)
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = 10.0
+    HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_CLIENT_HTTP2: bool = False  # requires the h2 package
+
     # Google OAuth
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = ""
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
 
     # GitHub OAuth
     GITHUB_CLIENT_ID: str = ""
     GITHUB_CLIENT_SECRET: str = ""
     GITHUB_REDIRECT_URI: str = ""
+    GITHUB_OAUTH_BASE_URL: str = "https://github.com"
+    GITHUB_API_BASE_URL: str = "https://api.github.com"
 
     # AWS S3
     AWS_ACCESS_KEY_ID: str = ""
@@ -57,6 +151,14 @@ class Settings(BaseSettings):
     AWS_S3_BUCKET: str = ""
     AWS_REGION: str = "us-east-1"
 
+    @property
+    def token_store_backend(self) -> str:
+        return self.TOKEN_STORE_BACKEND or ("memory" if self.ENVIRONMENT == "development" else "redis")
+
+    @property
+    def rate_limit_backend(self) -> str:
+        return self.RATE_LIMIT_BACKEND or ("memory" if self.ENVIRONMENT == "development" else "redis")
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,30 +1,119 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+import asyncio
+import itertools
+import logging
+import uuid
+from typing import List, Optional
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import NullPool
+from app.core.cache import TTLCache
+from app.core.client_ip import client_ip
 from app.core.config import settings
+from app.core.security import decode_token
+from app.core.db_pool import InstrumentedPool, PoolLivenessChecker, instrument_engine, pool_stats
+from app.core.sql_stats import instrument_queries
+from app.core.sqlite import create_sqlite_engine, is_sqlite_file
 
-# Create async engine
-# SQLite doesn't support pool_size and max_overflow
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_async_engine(
-        settings.DATABASE_URL,
-        echo=settings.DEBUG,
+logger = logging.getLogger(__name__)
+
+
+def _create_engine(url: str, query_only: bool = False) -> AsyncEngine:
+    if settings.SQLITE_TUNED and is_sqlite_file(url):
+        sqlite_engine = create_sqlite_engine(url, query_only=query_only)
+        instrument_queries(sqlite_engine)
+        return sqlite_engine
+    # SQLite doesn't support pool_size and max_overflow
+    if url.startswith("sqlite"):
+        sqlite_engine = create_async_engine(
+            url,
+            echo=settings.DATABASE_ECHO,
+            future=True,
+            connect_args={"check_same_thread": False}
+        )
+        instrument_queries(sqlite_engine)
+        return sqlite_engine
+    if settings.DATABASE_POOL_MODE == "pgbouncer":
+        return _create_pgbouncer_engine(url)
+    connect_args = {}
+    if make_url(url).get_driver_name() == "asyncpg":
+        # Server-side prepared statements kept per connection for hot queries
+        connect_args["prepared_statement_cache_size"] = settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE
+    pooled_engine = create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
         future=True,
-        connect_args={"check_same_thread": False}
+        connect_args=connect_args,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        # The background liveness check replaces the per-checkout ping
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING and not settings.DATABASE_POOL_LIVENESS_INTERVAL_SECONDS,
     )
-else:
-    engine = create_async_engine(
-        settings.DATABASE_URL,
-        echo=settings.DEBUG,
+    instrument_engine(pooled_engine)
+    instrument_queries(pooled_engine)
+    return pooled_engine
+
+
+def _create_pgbouncer_engine(url: str) -> AsyncEngine:
+    """
+    Engine for PostgreSQL behind PgBouncer in transaction pooling mode.
+
+    Consecutive transactions may run on different server connections, so
+    nothing may rely on per-connection server state: statement caches are
+    off and the statements asyncpg has to prepare get unique names, so they
+    cannot collide with one prepared by another client on the same server
+    connection. PgBouncer does the pooling; the app keeps no pool
+    (NullPool) or a small one (PGBOUNCER_CLIENT_POOL_SIZE).
+    """
+    connect_args = {}
+    if make_url(url).get_driver_name() == "asyncpg":
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    if settings.PGBOUNCER_CLIENT_POOL_SIZE > 0:
+        pool_args = {
+            "poolclass": InstrumentedPool,
+            "pool_size": settings.PGBOUNCER_CLIENT_POOL_SIZE,
+            "max_overflow": 0,
+            "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+            "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        }
+    else:
+        pool_args = {"poolclass": NullPool}
+
+    pgbouncer_engine = create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
         future=True,
-        pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
+        connect_args=connect_args,
+        **pool_args,
     )
+    if settings.PGBOUNCER_CLIENT_POOL_SIZE > 0:
+        instrument_engine(pgbouncer_engine)
+    instrument_queries(pgbouncer_engine)
+    return pgbouncer_engine
+
+
+class PrimarySession(Session):
+    """Session on the primary database; records whether it wrote anything."""
+
+
+# Create async engine
+engine = _create_engine(settings.DATABASE_URL)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -34,12 +123,191 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+# Read-your-writes pinning
+#
+# Replicas lag behind the primary, so a client that has just written is
+# pinned to the primary for READ_YOUR_WRITES_SECONDS. Clients are identified
+# by the user (the ``sub`` of their access token), or by IP address when
+# anonymous. Anonymous writes that sign a user in (registration, OAuth) also
+# pin that user with ``pin_user``, so the first authenticated read after
+# signup sees the new row. The pin is set at commit time, before the
+# response that reports the write is sent.
+
+read_your_writes_pins = TTLCache(
+    max_size=100000,
+    default_ttl=settings.READ_YOUR_WRITES_SECONDS,
+)
+
+
+def user_pin_key(email: str) -> str:
+    return f"user:{email}"
+
+
+def client_pin_key(request: Request) -> str:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        payload = decode_token(token)
+        if payload and payload.get("sub"):
+            return user_pin_key(payload["sub"])
+    return f"ip:{client_ip(request)}"
+
+
+def pin_user(session: AsyncSession, email: str) -> None:
+    """Also pin ``email``'s reads to the primary when this session commits a write."""
+    session.info.setdefault("pin_keys", set()).add(user_pin_key(email))
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _flush_wrote(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _statement_wrote(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _discard_write(session):
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _pin_after_write(session):
+    if session.info.pop("wrote", False):
+        for pin_key in session.info.get("pin_keys", ()):
+            read_your_writes_pins.set(pin_key, True)
+
+
+class ReplicaRouter:
+    """Round-robin over healthy read replicas, falling back to the primary."""
+
+    def __init__(self, engines: List[AsyncEngine], pin_after_write: bool = True):
+        self.replicas = []
+        self.pin_after_write = pin_after_write
+        for replica_engine in engines:
+            self.replicas.append({
+                "engine": replica_engine,
+                "sessionmaker": async_sessionmaker(
+                    replica_engine,
+                    class_=AsyncSession,
+                    expire_on_commit=False,
+                    autoflush=False,
+                ),
+                "healthy": True,
+                "reads": 0,
+                "failed_checks": 0,
+            })
+        self._cycle = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._health_task: Optional[asyncio.Task] = None
+        self.primary_reads = 0
+        self.pinned_reads = 0
+
+    def sessionmaker_for(self, pin_key: Optional[str]) -> async_sessionmaker:
+        if self.pin_after_write and pin_key and read_your_writes_pins.get(pin_key):
+            self.pinned_reads += 1
+            return AsyncSessionLocal
+
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._cycle)]
+            if replica["healthy"]:
+                replica["reads"] += 1
+                return replica["sessionmaker"]
+
+        self.primary_reads += 1
+        return AsyncSessionLocal
+
+    async def check_replicas(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica["engine"].connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=2)
+                if not replica["healthy"]:
+                    logger.info(f"Read replica {replica['engine'].url.host} is healthy again")
+                replica["healthy"] = True
+            except Exception as e:
+                if replica["healthy"]:
+                    logger.warning(f"Read replica {replica['engine'].url.host} failed health check: {e}")
+                replica["healthy"] = False
+                replica["failed_checks"] += 1
+
+    async def _health_loop(self) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        if self.replicas and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica["engine"].dispose()
+
+    def engines(self) -> List[AsyncEngine]:
+        return [replica["engine"] for replica in self.replicas]
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [
+                {
+                    "host": replica["engine"].url.host or replica["engine"].url.database,
+                    "healthy": replica["healthy"],
+                    "reads": replica["reads"],
+                    "failed_checks": replica["failed_checks"],
+                    "pool": pool_stats(replica["engine"]),
+                }
+                for replica in self.replicas
+            ],
+            "primary_reads": self.primary_reads,
+            "pinned_reads": self.pinned_reads,
+        }
+
+
+replica_urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+if not replica_urls and settings.SQLITE_TUNED and is_sqlite_file(settings.DATABASE_URL):
+    # Readers of a WAL database see every committed write, so no pinning
+    read_router = ReplicaRouter([_create_engine(settings.DATABASE_URL, query_only=True)], pin_after_write=False)
+else:
+    read_router = ReplicaRouter([_create_engine(url, query_only=True) for url in replica_urls])
+
+pool_liveness = PoolLivenessChecker(settings.DATABASE_POOL_LIVENESS_INTERVAL_SECONDS)
+
+
+def start_pool_liveness() -> None:
+    pool_liveness.start(lambda: [engine] + read_router.engines())
+
+
+def get_pool_stats() -> dict:
+    return {
+        "mode": settings.DATABASE_POOL_MODE,
+        "pre_ping": bool(getattr(engine.sync_engine.pool, "_pre_ping", False)),
+        "liveness_interval_seconds": settings.DATABASE_POOL_LIVENESS_INTERVAL_SECONDS,
+        "primary": pool_stats(engine),
+    }
+
+
 # Dependency to get database session
-async def get_db() -> AsyncSession:
+async def get_db(request: Request) -> AsyncSession:
     """
     Dependency function that yields database sessions.
+
+    With the tuned SQLite profile the primary has a single connection: don't
+    open another ``AsyncSessionLocal()`` while this session is in use, or
+    the request deadlocks until the pool timeout.
     """
     async with AsyncSessionLocal() as session:
+        session.info["pin_keys"] = {client_pin_key(request)}
         try:
             yield session
             await session.commit()
@@ -50,6 +318,35 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    Dependency function that yields read-only database sessions.
+
+    Sessions come from a healthy read replica, or from the primary when no
+    replica is available or the client wrote something moments ago. They are
+    never committed.
+    """
+    async with read_router.sessionmaker_for(client_pin_key(request))() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def warm_up_pools(connections: int) -> None:
+    """Open up to ``connections`` connections per engine ahead of the first request."""
+    async def open_connection(pooled_engine: AsyncEngine) -> None:
+        async with pooled_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    tasks = []
+    for pooled_engine in [engine] + read_router.engines():
+        pool = pooled_engine.sync_engine.pool
+        count = min(connections, pool.size()) if isinstance(pool, InstrumentedPool) else 1
+        tasks.extend(open_connection(pooled_engine) for _ in range(count))
+    await asyncio.gather(*tasks)
+
+
 async def init_db():
     """
     Initialize database tables.
@@ -62,4 +359,7 @@ async def close_db():
     """
     Close database connections.
     """
+    await pool_liveness.stop()
+    await read_router.stop()
+    await read_router.dispose()
     await engine.dispose()
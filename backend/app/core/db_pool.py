@@ -0,0 +1,171 @@
+"""
+Connection pool instrumentation.
+
+``InstrumentedPool`` is the async queue pool with counters: how long
+checkouts wait (including the pre-ping round trip when it is enabled), how
+often the pool times out, and how many connections get invalidated. Gauges
+for in-use, idle and overflow connections are read from the pool itself.
+
+``PoolLivenessChecker`` is the alternative to ``pool_pre_ping``: instead of
+a ``SELECT 1`` on every checkout, idle connections are pinged in the
+background every few seconds. A dead connection raises a disconnect error,
+which makes SQLAlchemy invalidate the whole pool so requests reconnect
+instead of failing on a stale socket.
+"""
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from typing import Callable, List, Optional
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the checkout latency histogram buckets; the last
+# bucket counts everything slower.
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_ms_total = 0.0
+        self.checkout_ms_max = 0.0
+        self.checkout_histogram = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.overflow_high_water = 0
+        self.liveness_checks = 0
+        self.liveness_failures = 0
+
+    def observe_checkout(self, elapsed_ms: float) -> None:
+        self.checkouts += 1
+        self.checkout_ms_total += elapsed_ms
+        self.checkout_ms_max = max(self.checkout_ms_max, elapsed_ms)
+        self.checkout_histogram[bisect_left(CHECKOUT_BUCKETS_MS, elapsed_ms)] += 1
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Async queue pool that records checkout latency and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.observe_checkout((time.perf_counter() - started) * 1000)
+        self.metrics.overflow_high_water = max(self.metrics.overflow_high_water, self.overflow())
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self) -> dict:
+        metrics = self.metrics
+        histogram = {
+            f"le_{bound}ms": count
+            for bound, count in zip(CHECKOUT_BUCKETS_MS, metrics.checkout_histogram)
+        }
+        histogram["slower"] = metrics.checkout_histogram[-1]
+        return {
+            "size": self.size(),
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "overflow_high_water": max(0, metrics.overflow_high_water),
+            "checkouts": metrics.checkouts,
+            "checkout_ms_avg": round(metrics.checkout_ms_total / metrics.checkouts, 3) if metrics.checkouts else 0.0,
+            "checkout_ms_max": round(metrics.checkout_ms_max, 3),
+            "checkout_ms_histogram": histogram,
+            "timeouts": metrics.timeouts,
+            "connects": metrics.connects,
+            # Every checkout of an existing connection costs one ping round trip
+            "pre_pings": max(0, metrics.checkouts - metrics.connects) if self._pre_ping else 0,
+            "invalidations": metrics.invalidations,
+            "soft_invalidations": metrics.soft_invalidations,
+            "liveness_checks": metrics.liveness_checks,
+            "liveness_failures": metrics.liveness_failures,
+        }
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count connects and invalidations of an engine using ``InstrumentedPool``."""
+    sync_engine = engine.sync_engine
+
+    # Listeners on the engine survive pool recreation on dispose()
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        sync_engine.pool.metrics.connects += 1
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        sync_engine.pool.metrics.invalidations += 1
+
+    @event.listens_for(sync_engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        sync_engine.pool.metrics.soft_invalidations += 1
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedPool):
+        return pool.stats()
+    return {"pool": type(pool).__name__}
+
+
+class PoolLivenessChecker:
+    """Periodically pings idle pooled connections in place of pre-ping."""
+
+    def __init__(self, interval: float, timeout: float = 5.0):
+        self.interval = interval
+        self.timeout = timeout
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self, engine: AsyncEngine) -> None:
+        pool = engine.sync_engine.pool
+        if not isinstance(pool, InstrumentedPool):
+            return
+
+        # The queue pool hands out idle connections FIFO, so checking out
+        # one at a time visits each of them once.
+        for _ in range(max(1, pool.checkedin())):
+            pool.metrics.liveness_checks += 1
+            try:
+                async with engine.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=self.timeout)
+            except Exception as e:
+                pool.metrics.liveness_failures += 1
+                logger.warning(f"Pool liveness check failed for {engine.url.host}: {e}")
+                return
+
+    async def _run(self, engines: Callable[[], List[AsyncEngine]]) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            for engine in engines():
+                await self.check(engine)
+
+    def start(self, engines: Callable[[], List[AsyncEngine]]) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(engines))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
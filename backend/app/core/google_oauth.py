@@ -1,12 +1,96 @@
 """Google OAuth utilities for authentication."""
-from google.oauth2 import id_token
-from google.auth.transport import requests
+import asyncio
+import logging
+import re
+import time
+from jose import jwt, JWTError
 from typing import Optional, Dict
 from app.core.config import settings
+from app.core.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
 
 GOOGLE_CLIENT_ID = settings.GOOGLE_CLIENT_ID
 GOOGLE_CLIENT_SECRET = settings.GOOGLE_CLIENT_SECRET
 GOOGLE_REDIRECT_URI = settings.GOOGLE_REDIRECT_URI
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+
+class GoogleCertStore:
+    """
+    Google's ID-token signing keys, kept in memory.
+
+    Keys are cached for the ``max-age`` Google sends in ``Cache-Control`` and
+    refreshed by a background task shortly before they expire, so verifying
+    an ID token normally needs no network call at all.
+    """
+
+    refresh_margin_seconds = 300
+    min_refetch_seconds = 60
+    default_max_age_seconds = 3600
+
+    def __init__(self, certs_url: str):
+        self.certs_url = certs_url
+        self._keys: Dict[str, dict] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _max_age(cache_control: str) -> int:
+        match = re.search(r"max-age=(\d+)", cache_control or "")
+        return int(match.group(1)) if match else GoogleCertStore.default_max_age_seconds
+
+    async def refresh(self) -> None:
+        response = await get_http_client().get(self.certs_url)
+        response.raise_for_status()
+        self._keys = {key["kid"]: key for key in response.json().get("keys", [])}
+        self._fetched_at = time.time()
+        self._expires_at = time.time() + self._max_age(response.headers.get("cache-control"))
+
+    def _needs_refresh(self, kid: str) -> bool:
+        now = time.time()
+        if now >= self._expires_at:
+            return True
+        # An unknown kid may mean Google rotated keys since the last fetch,
+        # but don't let forged kids trigger a fetch on every request.
+        return kid not in self._keys and now - self._fetched_at >= self.min_refetch_seconds
+
+    async def get_key(self, kid: str) -> Optional[dict]:
+        if self._needs_refresh(kid):
+            async with self._lock:
+                if self._needs_refresh(kid):
+                    await self.refresh()
+        return self._keys.get(kid)
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                async with self._lock:
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to refresh Google signing keys: {e}")
+            delay = max(30.0, self._expires_at - time.time() - self.refresh_margin_seconds)
+            await asyncio.sleep(delay)
+
+    def start(self) -> None:
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+google_cert_store = GoogleCertStore(settings.GOOGLE_CERTS_URL)
 
 
 def get_google_oauth_url() -> str:
@@ -48,12 +132,21 @@ async def verify_google_token(token: str) -> Optional[Dict[str, any]]:
         }
     """
     try:
-        # Verify the token
-        idinfo = id_token.verify_oauth2_token(
+        # Verify the token locally against the cached signing keys
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = await google_cert_store.get_key(kid)
+        if key is None:
+            raise JWTError(f"Unknown signing key {kid}")
+
+        idinfo = jwt.decode(
             token,
-            requests.Request(),
-            GOOGLE_CLIENT_ID
+            key,
+            algorithms=["RS256"],
+            audience=GOOGLE_CLIENT_ID,
+            options={"verify_at_hash": False}
         )
+        if idinfo.get("iss") not in GOOGLE_ISSUERS:
+            raise JWTError(f"Wrong issuer {idinfo.get('iss')}")
 
         # Token is valid, return user info
         return {
@@ -78,8 +171,6 @@ async def exchange_code_for_token(code: str) -> Optional[str]:
     Returns:
         The ID token if successful, None otherwise
     """
-    import httpx
-
     token_url = "https://oauth2.googleapis.com/token"
 
     data = {
@@ -91,12 +182,11 @@ async def exchange_code_for_token(code: str) -> Optional[str]:
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data)
-            response.raise_for_status()
+        response = await get_http_client().post(token_url, data=data)
+        response.raise_for_status()
 
-            tokens = response.json()
-            return tokens.get("id_token")
+        tokens = response.json()
+        return tokens.get("id_token")
     except Exception as e:
         print(f"Error exchanging code for token: {e}")
         return None
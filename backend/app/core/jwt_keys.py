@@ -0,0 +1,142 @@
+"""
+Asymmetric JWT signing keys.
+
+With ``JWT_ALGORITHM`` set to RS256 or ES256, tokens are signed with private
+keys stored as ``<kid>.pem`` files in ``JWT_KEYS_DIR`` and carry the key id in
+their ``kid`` header. Other services verify them offline with the public keys
+published at ``/.well-known/jwks.json``.
+
+Rotation schedule: the kid is the key's UTC creation time (``YYYYMMDDHHMMSS``).
+A new key is published in the JWKS for ``JWT_KEY_PUBLISH_AHEAD_HOURS`` before
+it is used for signing, so downstream JWKS caches already know it, and an old
+key stays published until every token it signed has expired. Run
+``scripts/rotate_jwt_keys.py`` periodically (e.g. daily from cron) to create
+and prune keys; workers pick up changes within ``KEY_RELOAD_SECONDS``.
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KID_FORMAT = "%Y%m%d%H%M%S"
+KEY_RELOAD_SECONDS = 60
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    return algorithm.startswith(("RS", "ES"))
+
+
+def generate_private_key_pem(algorithm: str) -> bytes:
+    """Generate a new PEM-encoded private key for the given JWT algorithm."""
+    if algorithm.startswith("RS"):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm.startswith("ES"):
+        curves = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}
+        key = ec.generate_private_key(curves[algorithm])
+    else:
+        raise ValueError(f"Unsupported asymmetric JWT algorithm: {algorithm}")
+
+    return key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+
+
+def kid_created_at(kid: str) -> datetime:
+    return datetime.strptime(kid, KID_FORMAT)
+
+
+def is_kid(name: str) -> bool:
+    try:
+        kid_created_at(name)
+    except ValueError:
+        return False
+    return True
+
+
+class SigningKey:
+    def __init__(self, kid: str, private_pem: bytes, algorithm: str):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.created_at = kid_created_at(kid)
+        self.private_pem = private_pem
+        self.public_pem = serialization.load_pem_private_key(private_pem, password=None).public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+
+    def public_jwk(self) -> dict:
+        data = jwk.construct(self.public_pem, self.algorithm).to_dict()
+        data.update({"kid": self.kid, "use": "sig", "alg": self.algorithm})
+        return data
+
+
+class KeyRing:
+    """Signing and verification keys loaded from ``JWT_KEYS_DIR``."""
+
+    def __init__(self, keys_dir: str, algorithm: str, publish_ahead: timedelta):
+        self.keys_dir = Path(keys_dir)
+        self.algorithm = algorithm
+        self.publish_ahead = publish_ahead
+        self._keys: Dict[str, SigningKey] = {}
+        self._jwks: Optional[dict] = None
+        self._loaded_at = 0.0
+
+    def _load(self) -> None:
+        keys = {}
+        if self.keys_dir.exists():
+            for path in sorted(self.keys_dir.glob("*.pem")):
+                if not is_kid(path.stem):
+                    logger.warning(f"Ignoring {path}: not named <{KID_FORMAT}>.pem")
+                    continue
+                try:
+                    keys[path.stem] = SigningKey(path.stem, path.read_bytes(), self.algorithm)
+                except ValueError as e:
+                    logger.warning(f"Ignoring {path}: not a usable private key ({e})")
+        self._keys = keys
+        self._jwks = None
+        self._loaded_at = time.monotonic()
+
+    def keys(self) -> List[SigningKey]:
+        if time.monotonic() - self._loaded_at > KEY_RELOAD_SECONDS:
+            self._load()
+        return sorted(self._keys.values(), key=lambda key: key.created_at)
+
+    def signing_key(self) -> SigningKey:
+        """Return the newest key that has been published long enough to sign with."""
+        keys = self.keys()
+        if not keys:
+            raise RuntimeError(
+                f"No JWT signing keys found in {self.keys_dir}. Run scripts/rotate_jwt_keys.py first."
+            )
+        cutoff = datetime.utcnow() - self.publish_ahead
+        active = [key for key in keys if key.created_at <= cutoff]
+        return active[-1] if active else keys[0]
+
+    def verification_key(self, kid: Any) -> Optional[SigningKey]:
+        """Key for ``kid``, which comes from an unverified token header."""
+        if not isinstance(kid, str):
+            return None
+        self.keys()
+        return self._keys.get(kid)
+
+    def jwks(self) -> dict:
+        keys = self.keys()
+        if self._jwks is None:
+            self._jwks = {"keys": [key.public_jwk() for key in keys]}
+        return self._jwks
+
+
+key_ring = KeyRing(
+    settings.JWT_KEYS_DIR,
+    settings.JWT_ALGORITHM,
+    timedelta(hours=settings.JWT_KEY_PUBLISH_AHEAD_HOURS),
+)
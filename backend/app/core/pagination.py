@@ -0,0 +1,71 @@
+"""
+Keyset (cursor) pagination.
+
+List endpoints return rows newest first, ordered by ``(created_at, id)``.
+Instead of ``OFFSET``, which makes the database read and discard every
+skipped row, the next page starts strictly after the last row returned:
+
+    WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC LIMIT n
+
+With an index ending in ``(created_at, id)`` that is a single range scan,
+so page 1000 costs the same as page 1. The position is handed to clients
+as an opaque, URL-safe cursor token.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    payload = json.dumps([created_at.isoformat(), id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(uuid.UUID(id))
+    except Exception:
+        raise InvalidCursorError("Invalid pagination cursor")
+
+
+def keyset_page(stmt: Select, model: Any, cursor: Optional[str], limit: int) -> Select:
+    """
+    Restrict ``stmt`` to the page after ``cursor``, newest first.
+
+    One extra row is fetched to tell whether another page follows; pass the
+    rows to ``page_result``.
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(model.created_at, model.id)
+            < tuple_(literal(created_at, model.created_at.type), literal(id, model.id.type))
+        )
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def page_result(rows: List[Any], limit: int) -> dict:
+    """``{"items": ..., "next_cursor": ...}`` from the rows of a ``keyset_page`` query."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+async def paginate(db: AsyncSession, stmt: Select, model: Any, cursor: Optional[str], limit: int) -> dict:
+    """Run ``stmt`` (selecting ``model``) for one page."""
+    result = await db.execute(keyset_page(stmt, model, cursor, limit))
+    return page_result(result.scalars().all(), limit)
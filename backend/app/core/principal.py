@@ -0,0 +1,103 @@
+"""
+Authenticated principal cache.
+
+Authorizing a request only needs a handful of user columns, so instead of
+loading the full ``users`` row (password hash, 2FA secret, tokens) on every
+call we keep a small slotted snapshot per subject in a bounded TTL/LRU cache.
+Handlers that change the user must call ``invalidate_principal`` so the next
+request reloads it. The cache is per process, so the TTL bounds how long
+another worker may serve a stale snapshot.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import read_router
+from app.models.user import User
+
+
+class Principal:
+    """Read-only snapshot of the user columns needed to authorize a request."""
+
+    __slots__ = (
+        "id",
+        "email",
+        "full_name",
+        "company_name",
+        "bio",
+        "profile_picture",
+        "phone",
+        "role",
+        "is_active",
+        "is_verified",
+        "two_factor_enabled",
+        "created_at",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        email: str,
+        full_name: str,
+        company_name: Optional[str],
+        bio: Optional[str],
+        profile_picture: Optional[str],
+        phone: Optional[str],
+        role: str,
+        is_active: bool,
+        is_verified: bool,
+        two_factor_enabled: bool,
+        created_at: Optional[datetime],
+    ):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.company_name = company_name
+        self.bio = bio
+        self.profile_picture = profile_picture
+        self.phone = phone
+        self.role = role
+        self.is_active = is_active
+        self.is_verified = is_verified
+        self.two_factor_enabled = two_factor_enabled
+        self.created_at = created_at
+
+    @classmethod
+    def from_row(cls, row) -> "Principal":
+        """Build a principal from a row or ORM object exposing the slot names."""
+        return cls(**{name: getattr(row, name) for name in cls.__slots__})
+
+    def __repr__(self):
+        return f"<Principal {self.email}>"
+
+
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    default_ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(email: str) -> None:
+    """Drop the cached principal for a user after it has been modified."""
+    principal_cache.invalidate(email)
+
+
+async def prefill_principal_cache(limit: int) -> int:
+    """Load the most recently seen users into the cache. Returns the count."""
+    if limit <= 0:
+        return 0
+
+    columns = [getattr(User, name) for name in Principal.__slots__]
+    async with read_router.sessionmaker_for(None)() as session:
+        result = await session.execute(
+            select(*columns)
+            .where(User.last_seen_at.isnot(None))
+            .order_by(User.last_seen_at.desc())
+            .limit(limit)
+        )
+        rows = result.all()
+
+    for row in rows:
+        principal_cache.set(row.email, Principal.from_row(row))
+    return len(rows)
@@ -0,0 +1,274 @@
+"""
+Login admission control.
+
+Every login attempt costs a database lookup and a bcrypt verify, so attempts
+are admitted through token buckets keyed by account and by client IP before
+any of that work happens. Accounts that keep failing are locked out for an
+exponentially growing period.
+
+Each worker keeps its own buckets and a copy of known lockouts, so floods
+against one worker are rejected in memory without any I/O. Attempts that
+pass the local check are then counted against the global buckets in Redis
+with a single script call, which enforces the limits across all workers.
+While Redis is unreachable, failures and lockouts are tracked per worker
+instead, and the outage is logged.
+
+Client IPs come from ``app.core.client_ip``, so behind a reverse proxy
+``TRUSTED_PROXIES`` must list it or every client shares the proxy's bucket.
+"""
+import hashlib
+import logging
+import time
+from collections import Counter, OrderedDict
+from typing import Optional, Tuple
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+class LocalTokenBuckets:
+    """Token buckets per key, bounded to the most recently used keys."""
+
+    def __init__(self, capacity: float, refill_per_second: float, max_keys: int = 100000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str) -> float:
+        """Take a token; return 0 if allowed, otherwise seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_per_second)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / self.refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def lockout_seconds(failures: int) -> int:
+    """Lockout length after ``failures`` consecutive failed attempts."""
+    if failures < settings.LOGIN_LOCKOUT_THRESHOLD:
+        return 0
+    exponent = min(failures - settings.LOGIN_LOCKOUT_THRESHOLD, 32)
+    return min(settings.LOGIN_LOCKOUT_MAX_SECONDS, settings.LOGIN_LOCKOUT_BASE_SECONDS * 2 ** exponent)
+
+
+# KEYS: lockout, account bucket, ip bucket
+# ARGV: now, account capacity, account rate, ip capacity, ip rate
+# Returns the number of seconds to wait as a string ("0" when admitted).
+_ADMIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local locked = redis.call('PTTL', KEYS[1])
+if locked > 0 then
+    return tostring(locked / 1000)
+end
+
+local function take(key, capacity, rate)
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+    return wait
+end
+
+local wait = math.max(
+    take(KEYS[2], tonumber(ARGV[2]), tonumber(ARGV[3])),
+    take(KEYS[3], tonumber(ARGV[4]), tonumber(ARGV[5]))
+)
+return tostring(wait)
+"""
+
+
+class RedisLoginBackend:
+    """Global buckets, failure counters and lockouts shared by all workers."""
+
+    def __init__(self):
+        self._admit_script = None
+
+    async def admit(self, account: str, ip: str) -> float:
+        if self._admit_script is None:
+            self._admit_script = get_redis().register_script(_ADMIT_SCRIPT)
+        result = await self._admit_script(
+            keys=[f"login_lockout:{account}", f"login_bucket:account:{account}", f"login_bucket:ip:{ip}"],
+            args=[
+                time.time(),
+                settings.LOGIN_RATE_LIMIT_ACCOUNT_PER_MINUTE,
+                settings.LOGIN_RATE_LIMIT_ACCOUNT_PER_MINUTE / 60,
+                settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE,
+                settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE / 60,
+            ],
+        )
+        return float(result)
+
+    async def record_failure(self, account: str) -> int:
+        redis = get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(f"login_failures:{account}")
+            pipe.expire(f"login_failures:{account}", settings.LOGIN_LOCKOUT_MAX_SECONDS)
+            failures, _ = await pipe.execute()
+
+        lockout = lockout_seconds(failures)
+        if lockout:
+            await redis.set(f"login_lockout:{account}", 1, ex=lockout)
+        return lockout
+
+    async def record_success(self, account: str) -> None:
+        await get_redis().delete(f"login_failures:{account}")
+
+
+class InMemoryLoginBackend:
+    """Process-local backend, used in tests and single-process development."""
+
+    def __init__(self, max_accounts: int = 100000):
+        # Like the Redis counters, a failure streak is forgotten
+        # LOGIN_LOCKOUT_MAX_SECONDS after its last failure.
+        self._failures = TTLCache(max_accounts, settings.LOGIN_LOCKOUT_MAX_SECONDS)
+
+    async def admit(self, account: str, ip: str) -> float:
+        # The local buckets and lockouts already cover a single process.
+        return 0.0
+
+    async def record_failure(self, account: str) -> int:
+        failures = (self._failures.get(account) or 0) + 1
+        self._failures.set(account, failures)
+        return lockout_seconds(failures)
+
+    async def record_success(self, account: str) -> None:
+        self._failures.invalidate(account)
+
+
+class LoginLimiter:
+    """Admit or reject login attempts before any password work is done."""
+
+    def __init__(self, backend):
+        self._backend = backend
+        # Counts failures in this worker while the backend is unreachable
+        self._fallback = InMemoryLoginBackend()
+        self._backend_down = False
+        self._account_buckets = LocalTokenBuckets(
+            settings.LOGIN_RATE_LIMIT_ACCOUNT_PER_MINUTE,
+            settings.LOGIN_RATE_LIMIT_ACCOUNT_PER_MINUTE / 60,
+        )
+        self._ip_buckets = LocalTokenBuckets(
+            settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE,
+            settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE / 60,
+        )
+        self._lockouts: "OrderedDict[str, float]" = OrderedDict()
+        self.counters = Counter()
+        self.rejections_by_key = Counter()
+
+    @staticmethod
+    def account_key(username: str) -> str:
+        return hashlib.sha256(username.strip().lower().encode()).hexdigest()[:32]
+
+    def _backend_failed(self, e: Exception) -> None:
+        self.counters["backend_errors"] += 1
+        if not self._backend_down:
+            self._backend_down = True
+            logger.warning(f"Login rate limit backend unavailable, limiting per worker only: {e}")
+
+    def _backend_ok(self) -> None:
+        if self._backend_down:
+            self._backend_down = False
+            logger.info("Login rate limit backend available again")
+
+    def _reject(self, reason: str, key: str, retry_after: float) -> float:
+        self.counters[f"rejected_{reason}"] += 1
+        self.rejections_by_key[key] += 1
+        if len(self.rejections_by_key) > 10000:
+            self.rejections_by_key = Counter(dict(self.rejections_by_key.most_common(1000)))
+        return max(1.0, retry_after)
+
+    async def admit(self, username: str, ip: str) -> Optional[float]:
+        """
+        Return None if the attempt may proceed, otherwise the seconds to wait.
+        """
+        account = self.account_key(username)
+
+        locked_until = self._lockouts.get(account)
+        if locked_until is not None:
+            if locked_until > time.monotonic():
+                return self._reject("lockout", f"account:{account[:12]}", locked_until - time.monotonic())
+            del self._lockouts[account]
+
+        retry_after = self._ip_buckets.take(ip)
+        if retry_after:
+            return self._reject("ip", f"ip:{ip}", retry_after)
+
+        retry_after = self._account_buckets.take(account)
+        if retry_after:
+            return self._reject("account", f"account:{account[:12]}", retry_after)
+
+        try:
+            retry_after = await self._backend.admit(account, ip)
+            self._backend_ok()
+        except Exception as e:
+            # Redis unavailable: the local limits still apply.
+            self._backend_failed(e)
+            retry_after = 0.0
+        if retry_after:
+            return self._reject("global", f"account:{account[:12]}", retry_after)
+
+        self.counters["admitted"] += 1
+        return None
+
+    async def record_failure(self, username: str) -> None:
+        account = self.account_key(username)
+        self.counters["failures"] += 1
+        try:
+            lockout = await self._backend.record_failure(account)
+            self._backend_ok()
+        except Exception as e:
+            self._backend_failed(e)
+            lockout = await self._fallback.record_failure(account)
+        if lockout:
+            self.counters["lockouts"] += 1
+            self._lockouts[account] = time.monotonic() + lockout
+            if len(self._lockouts) > 100000:
+                self._lockouts.popitem(last=False)
+
+    async def record_success(self, username: str) -> None:
+        account = self.account_key(username)
+        self._lockouts.pop(account, None)
+        await self._fallback.record_success(account)
+        try:
+            await self._backend.record_success(account)
+        except Exception as e:
+            self._backend_failed(e)
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "backend_available": not self._backend_down,
+            "tracked_accounts": len(self._account_buckets),
+            "tracked_ips": len(self._ip_buckets),
+            "active_lockouts": sum(1 for until in self._lockouts.values() if until > time.monotonic()),
+            "top_rejected_keys": dict(self.rejections_by_key.most_common(20)),
+        }
+
+
+if settings.rate_limit_backend == "memory":
+    login_limiter = LoginLimiter(InMemoryLoginBackend())
+else:
+    login_limiter = LoginLimiter(RedisLoginBackend())
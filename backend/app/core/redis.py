@@ -0,0 +1,44 @@
+"""
+Shared Redis connection.
+"""
+from typing import List, Optional
+from redis.asyncio import Redis
+from app.core.config import settings
+
+_redis: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """
+    Return the process-wide Redis client, creating it on first use.
+    """
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def check_redis(required_by: List[str]) -> None:
+    """
+    Fail fast if Redis is unreachable while the settings in ``required_by``
+    depend on it, instead of failing every request that needs it.
+    """
+    if not required_by:
+        return
+    try:
+        await get_redis().ping()
+    except Exception as e:
+        raise RuntimeError(
+            f"Redis (REDIS_URL) is not reachable ({e}) but is required by {', '.join(required_by)}. "
+            f"Start Redis, or set them to 'memory' for single-process development."
+        ) from e
+
+
+async def close_redis() -> None:
+    """
+    Close the Redis connection pool.
+    """
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
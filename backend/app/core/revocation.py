@@ -0,0 +1,307 @@
+"""
+Access-token revocation.
+
+Revoked token ids (``jti``) are kept in Redis until the token would have
+expired anyway. Checking Redis on every request would add a round trip to
+every authenticated call, so each worker also keeps Bloom filters of revoked
+ids: a miss there is a definitive "not revoked" answered in memory, and only
+a hit (a real revocation or a rare false positive) is confirmed against
+Redis. New revocations reach the other workers over Redis pub/sub.
+Until a worker's filters have been loaded (and again while they are
+reloaded after a listener disconnect) every lookup goes to Redis. The
+listener subscribes before it loads, so a revocation published during the
+load is not lost.
+
+Filters are bucketed by token expiry, so once every token in a bucket has
+expired the whole bucket is dropped instead of rebuilding a filter.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class InMemoryRevocationBackend:
+    """Process-local backend, used in tests and single-process development."""
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        self._subscribers: List[asyncio.Queue] = []
+
+    async def add(self, jti: str, exp: float) -> None:
+        self._revoked[jti] = exp
+        for queue in self._subscribers:
+            queue.put_nowait((jti, exp))
+
+    async def contains(self, jti: str) -> bool:
+        exp = self._revoked.get(jti)
+        if exp is None:
+            return False
+        if exp <= time.time():
+            del self._revoked[jti]
+            return False
+        return True
+
+    async def entries(self) -> AsyncIterator[Tuple[str, float]]:
+        for jti, exp in list(self._revoked.items()):
+            yield jti, exp
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[AsyncIterator[Tuple[str, float]]]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+
+        async def messages() -> AsyncIterator[Tuple[str, float]]:
+            while True:
+                yield await queue.get()
+
+        try:
+            yield messages()
+        finally:
+            self._subscribers.remove(queue)
+
+
+class RedisRevocationBackend:
+    """Backend shared by all workers, kept in ``settings.REDIS_URL``."""
+
+    key_prefix = "revoked_token:"
+    channel = "revoked_tokens"
+
+    async def add(self, jti: str, exp: float) -> None:
+        ttl = max(1, int(math.ceil(exp - time.time())))
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.set(f"{self.key_prefix}{jti}", int(exp), ex=ttl)
+            pipe.publish(self.channel, f"{jti} {int(exp)}")
+            await pipe.execute()
+
+    async def contains(self, jti: str) -> bool:
+        return bool(await get_redis().exists(f"{self.key_prefix}{jti}"))
+
+    async def entries(self) -> AsyncIterator[Tuple[str, float]]:
+        redis = get_redis()
+        async for key in redis.scan_iter(match=f"{self.key_prefix}*", count=1000):
+            exp = await redis.get(key)
+            if exp is not None:
+                yield key[len(self.key_prefix):], float(exp)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[AsyncIterator[Tuple[str, float]]]:
+        """
+        Subscribe to new revocations; the context yields an iterator over them.
+
+        Returns once Redis has confirmed the subscription, so everything
+        published afterwards is received.
+        """
+        pubsub = get_redis().pubsub()
+
+        async def messages() -> AsyncIterator[Tuple[str, float]]:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                jti, _, exp = message["data"].partition(" ")
+                yield jti, float(exp)
+
+        try:
+            await pubsub.subscribe(self.channel)
+            while (await pubsub.get_message(timeout=1.0) or {}).get("type") != "subscribe":
+                pass
+            yield messages()
+        finally:
+            await pubsub.aclose()
+
+
+class RevocationList:
+    """Revoked access tokens with a per-worker Bloom filter fast path."""
+
+    def __init__(self, backend, capacity: int, error_rate: float, bucket_seconds: int):
+        self._backend = backend
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bucket_seconds = max(1, bucket_seconds)
+        self._filters: Dict[int, BloomFilter] = {}
+        self.loaded = False
+        self.unloaded_lookups = 0
+        self.filter_negatives = 0
+        self.filter_positives = 0
+        self.false_positives = 0
+        self.backend_errors = 0
+        self.revocations = 0
+
+    def _drop_expired_buckets(self) -> None:
+        now = time.time()
+        for bucket in [b for b in self._filters if (b + 1) * self.bucket_seconds <= now]:
+            del self._filters[bucket]
+
+    def add_local(self, jti: str, exp: float) -> None:
+        """Record a revocation in this worker's filters."""
+        if exp <= time.time():
+            return
+        bucket = int(exp) // self.bucket_seconds
+        bloom = self._filters.get(bucket)
+        if bloom is None:
+            self._drop_expired_buckets()
+            bloom = self._filters[bucket] = BloomFilter(self.capacity, self.error_rate)
+        bloom.add(jti)
+
+    def _might_be_revoked(self, jti: str, exp: float) -> bool:
+        bloom = self._filters.get(int(exp) // self.bucket_seconds)
+        return bloom is not None and jti in bloom
+
+    async def is_revoked(self, payload: dict) -> bool:
+        """Return True if the token described by ``payload`` has been revoked."""
+        jti = payload.get("jti")
+        exp = payload.get("exp")
+        if not jti or not isinstance(exp, (int, float)):
+            return False
+
+        if not self.loaded:
+            # A miss in a partially loaded filter proves nothing.
+            self.unloaded_lookups += 1
+            try:
+                return await self._backend.contains(jti)
+            except Exception as e:
+                # Without the backend there is nothing to check against; this
+                # is the same answer the filter gives for an unknown token.
+                self.backend_errors += 1
+                logger.error(f"Revocation lookup failed before the filters were loaded: {e}")
+                return False
+
+        if not self._might_be_revoked(jti, exp):
+            self.filter_negatives += 1
+            return False
+
+        self.filter_positives += 1
+        try:
+            revoked = await self._backend.contains(jti)
+        except Exception as e:
+            # Fail closed: the filter says this token was probably revoked.
+            self.backend_errors += 1
+            logger.error(f"Revocation lookup failed, treating token as revoked: {e}")
+            return True
+
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    async def revoke(self, payload: dict) -> None:
+        """Revoke the token described by ``payload`` until it expires."""
+        jti = payload.get("jti")
+        exp = payload.get("exp")
+        if not jti or not isinstance(exp, (int, float)) or exp <= time.time():
+            return
+
+        await self._backend.add(jti, exp)
+        self.add_local(jti, exp)
+        self.revocations += 1
+
+    async def load(self) -> int:
+        """Populate the local filters from the backend."""
+        count = 0
+        async for jti, exp in self._backend.entries():
+            self.add_local(jti, exp)
+            count += 1
+        return count
+
+    async def _receive(self, revocations: AsyncIterator[Tuple[str, float]]) -> None:
+        async for jti, exp in revocations:
+            self.add_local(jti, exp)
+        raise ConnectionError("Revocation subscription ended")
+
+    async def listen(self) -> None:
+        """Apply revocations published by other workers, reconnecting on errors."""
+        while True:
+            try:
+                async with self._backend.subscribe() as revocations:
+                    # Already subscribed: revocations published while the
+                    # existing ones are loaded go straight into the filters.
+                    receiver = asyncio.create_task(self._receive(revocations))
+                    try:
+                        await self.load()
+                        self.loaded = True
+                        await receiver
+                    finally:
+                        self.loaded = False
+                        receiver.cancel()
+                        await asyncio.gather(receiver, return_exceptions=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.backend_errors += 1
+                logger.warning(f"Revocation listener disconnected: {e}")
+                await asyncio.sleep(5)
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "buckets": len(self._filters),
+            "unloaded_lookups": self.unloaded_lookups,
+            "filter_negatives": self.filter_negatives,
+            "filter_positives": self.filter_positives,
+            "false_positives": self.false_positives,
+            "backend_errors": self.backend_errors,
+            "revocations": self.revocations,
+        }
+
+
+if settings.token_store_backend == "memory":
+    _backend = InMemoryRevocationBackend()
+else:
+    _backend = RedisRevocationBackend()
+
+revocation_list = RevocationList(
+    _backend,
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    bucket_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+_listener_task: Optional[asyncio.Task] = None
+
+
+def start_revocation_listener() -> None:
+    """Start receiving revocations from other workers."""
+    global _listener_task
+    if _listener_task is None:
+        _listener_task = asyncio.create_task(revocation_list.listen())
+
+
+async def stop_revocation_listener() -> None:
+    """Stop the revocation listener task."""
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
@@ -0,0 +1,78 @@
+"""
+Startup schema version check.
+
+Workers no longer run ``create_all`` on boot (reflection queries for every
+table, and it silently papers over tables Alembic doesn't know about).
+Instead the revision stored in ``alembic_version`` is compared with the
+head(s) of the migration scripts shipped with the code: one query.
+Migrations are applied by the deploy (``alembic upgrade head``), not by the
+app.
+"""
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def alembic_config():
+    """Alembic config that works regardless of the current directory."""
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return config
+
+
+@lru_cache(maxsize=1)
+def expected_revisions() -> FrozenSet[str]:
+    """Head revision(s) of the migration scripts."""
+    from alembic.script import ScriptDirectory
+
+    return frozenset(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+async def current_revisions() -> FrozenSet[str]:
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        return frozenset(result.scalars())
+
+
+async def check_schema_version() -> None:
+    """
+    Compare the database revision with the code's migration head.
+
+    With ``SCHEMA_VERSION_CHECK=error`` a mismatch (or an unreachable or
+    unversioned database) raises ``SchemaVersionError`` and the worker does
+    not start; with ``warn`` it is logged.
+    """
+    if settings.SCHEMA_VERSION_CHECK == "off":
+        return
+
+    expected = expected_revisions()
+    try:
+        current = await current_revisions()
+    except Exception as e:
+        problem = f"Could not read the schema version: {e}"
+    else:
+        if current == expected:
+            return
+        problem = (
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"code expects {', '.join(sorted(expected))}; run 'alembic upgrade head'"
+        )
+
+    if settings.SCHEMA_VERSION_CHECK == "error":
+        raise SchemaVersionError(problem)
+    logger.warning(problem)
+    print(f"Warning: {problem}")
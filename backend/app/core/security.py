@@ -1,11 +1,47 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.jwt_keys import is_asymmetric, key_ring
+import asyncio
+import hashlib
 import secrets
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_password_context(
+    scheme: str = settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds: int = settings.BCRYPT_ROUNDS,
+    argon2_time_cost: int = settings.ARGON2_TIME_COST,
+    argon2_memory_cost: int = settings.ARGON2_MEMORY_COST,
+    argon2_parallelism: int = settings.ARGON2_PARALLELISM,
+) -> CryptContext:
+    """
+    Build the password hashing context.
+
+    The configured scheme and cost are pinned as both minimum and maximum, so
+    any hash made with another scheme or cost reports ``needs_update`` and is
+    rehashed on the user's next successful login.
+    """
+    options = {
+        "bcrypt__default_rounds": bcrypt_rounds,
+        "bcrypt__min_rounds": bcrypt_rounds,
+        "bcrypt__max_rounds": bcrypt_rounds,
+    }
+    if scheme == "argon2":
+        schemes = ["argon2", "bcrypt"]
+        options.update({
+            "argon2__rounds": argon2_time_cost,
+            "argon2__memory_cost": argon2_memory_cost,
+            "argon2__parallelism": argon2_parallelism,
+        })
+    else:
+        schemes = ["bcrypt"]
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+pwd_context = build_password_context()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -15,6 +51,95 @@ def get_password_hash(password: str) -> str:
     """Generate password hash."""
     return pwd_context.hash(password)
 
+def password_needs_rehash(hashed_password: Optional[str]) -> bool:
+    """Check whether a hash was made with an outdated scheme or cost."""
+    return bool(hashed_password) and pwd_context.needs_update(hashed_password)
+
+
+# Password hashing worker pool
+#
+# bcrypt holds the CPU for a few hundred milliseconds per call, so async
+# handlers must never call verify_password/get_password_hash directly.
+# The async variants below run them on a bounded executor; once every worker
+# is busy and the waiting queue is full, new requests are rejected with 503
+# instead of piling up behind the pool.
+
+_hash_executor: Optional[Executor] = None
+_hash_pending = 0
+
+
+def _get_hash_executor() -> Executor:
+    """Create the password hashing executor on first use."""
+    global _hash_executor
+    if _hash_executor is None:
+        workers = max(1, settings.PASSWORD_HASH_WORKERS)
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="password-hash"
+            )
+    return _hash_executor
+
+
+async def _run_in_hash_pool(func, *args):
+    """Run a password hashing function on the worker pool with backpressure."""
+    global _hash_pending
+    capacity = max(1, settings.PASSWORD_HASH_WORKERS) + max(0, settings.PASSWORD_HASH_MAX_QUEUE)
+    if _hash_pending >= capacity:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop."""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Generate password hash without blocking the event loop."""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+def get_password_hash_pool_stats() -> dict:
+    """Return the current load of the password hashing pool."""
+    return {
+        "executor": settings.PASSWORD_HASH_EXECUTOR,
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+        "pending": _hash_pending,
+    }
+
+
+def shutdown_password_hasher() -> None:
+    """Shut down the password hashing executor."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+def _encode_token(claims: dict) -> str:
+    """Sign claims with the shared secret or the current asymmetric key."""
+    if is_asymmetric(settings.JWT_ALGORITHM):
+        key = key_ring.signing_key()
+        return jwt.encode(claims, key.private_pem, algorithm=key.algorithm, headers={"kid": key.kid})
+    return jwt.encode(claims, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+def new_token_id() -> str:
+    """Generate a unique token identifier for the jti/fam claims."""
+    return secrets.token_urlsafe(16)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token."""
     to_encode = data.copy()
@@ -24,27 +149,71 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
+    to_encode.update({"exp": expire, "type": "access", "jti": new_token_id()})
+    return _encode_token(to_encode)
 
-def create_refresh_token(data: dict) -> str:
-    """Create JWT refresh token."""
+def create_refresh_token(data: dict, family_id: Optional[str] = None, token_id: Optional[str] = None) -> str:
+    """Create JWT refresh token belonging to a refresh-token family."""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
 
-    to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return encoded_jwt
+    to_encode.update({
+        "exp": expire,
+        "type": "refresh",
+        "jti": token_id or new_token_id(),
+        "fam": family_id or new_token_id(),
+    })
+    return _encode_token(to_encode)
 
-def decode_token(token: str) -> Optional[dict]:
-    """Decode JWT token."""
+# Verified token cache
+#
+# Clients send the same access token many times during its lifetime, so its
+# verified payload is cached under a SHA-256 digest of the token (the raw
+# token is never kept as a key) until the token's own ``exp``. Only the
+# signature check and JSON parse are skipped on a hit; any revocation check
+# must run on the returned payload on every call.
+
+token_cache = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    default_ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _decode_token_uncached(token: str) -> Optional[dict]:
     try:
+        if is_asymmetric(settings.JWT_ALGORITHM):
+            key = key_ring.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                return None
+            return jwt.decode(token, key.public_pem, algorithms=[key.algorithm])
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
         return payload
     except JWTError:
         return None
 
+
+def decode_token(token: str) -> Optional[dict]:
+    """Decode JWT token."""
+    digest = _token_digest(token)
+    payload = token_cache.get(digest)
+    if payload is None:
+        payload = _decode_token_uncached(token)
+        if payload is None:
+            return None
+        exp = payload.get("exp")
+        if payload.get("type") == "access" and isinstance(exp, (int, float)):
+            token_cache.set(digest, payload, expires_at=exp)
+    return dict(payload)
+
+
+def evict_token(token: str) -> None:
+    """Remove a token from the verified token cache."""
+    token_cache.invalidate(_token_digest(token))
+
 def generate_reset_token() -> str:
     """Generate a secure random token for password reset."""
     return secrets.token_urlsafe(32)
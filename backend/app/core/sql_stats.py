@@ -0,0 +1,168 @@
+"""
+Per-request SQL instrumentation.
+
+Cursor execute hooks on every engine count statements and time them. While a
+request is in flight, the counts go to that request's ``RequestQueryStats``
+(found through a context variable); ``QueryStatsMiddleware`` then
+
+* adds a ``Server-Timing: db;dur=...`` header,
+* logs statements that ran ``SQL_N_PLUS_ONE_THRESHOLD`` or more times in one
+  request (same SQL text, different parameters) as suspected N+1 queries,
+* folds the totals into per-route statistics served under ``/metrics``.
+
+Independently of requests, SELECTs slower than ``SQL_SLOW_QUERY_MS`` are
+logged together with their ``EXPLAIN`` plan.
+"""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RequestQueryStats:
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.queries += 1
+        self.db_seconds += elapsed
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> Dict[str, int]:
+        return {statement: count for statement, count in self.statements.items() if count >= threshold}
+
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+class RouteQueryStats:
+    def __init__(self):
+        # route -> [requests, queries, db seconds, max queries, N+1 suspects]
+        self.routes: Dict[str, list] = {}
+        self.slow_queries = 0
+
+    def add(self, route: str, stats: RequestQueryStats, n_plus_one: int) -> None:
+        entry = self.routes.setdefault(route, [0, 0, 0.0, 0, 0])
+        entry[0] += 1
+        entry[1] += stats.queries
+        entry[2] += stats.db_seconds
+        entry[3] = max(entry[3], stats.queries)
+        entry[4] += n_plus_one
+
+    def stats(self) -> dict:
+        return {
+            "slow_queries": self.slow_queries,
+            "routes": {
+                route: {
+                    "requests": requests,
+                    "queries": queries,
+                    "queries_per_request": round(queries / requests, 2),
+                    "max_queries": max_queries,
+                    "db_ms_per_request": round(db_seconds * 1000 / requests, 3),
+                    "n_plus_one_suspects": n_plus_one,
+                }
+                for route, (requests, queries, db_seconds, max_queries, n_plus_one) in sorted(self.routes.items())
+            },
+        }
+
+
+route_query_stats = RouteQueryStats()
+
+
+def explain_statement(conn, statement: str, parameters) -> str:
+    """Plan for a statement that just ran, taken on the same connection."""
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(value) for value in row) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """Attach the timing hooks to an engine."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+        if elapsed * 1000 < settings.SQL_SLOW_QUERY_MS:
+            return
+
+        route_query_stats.slow_queries += 1
+        plan = None
+        # Only plain SELECTs: EXPLAIN never changes data then, and it cannot
+        # fail and abort the caller's transaction for a query that just ran.
+        # It runs on a raw DBAPI cursor, so these hooks do not see it.
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            try:
+                plan = explain_statement(conn, statement, parameters)
+            except Exception as e:
+                plan = f"(EXPLAIN failed: {e})"
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement}\nPlan:\n{plan or '(not captured)'}")
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware that reports the SQL work done by each request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_INSTRUMENTATION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                # Yield dependencies (get_db's commit) have finished by now
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None)
+            if route_path is not None:
+                repeated = stats.repeated_statements(settings.SQL_N_PLUS_ONE_THRESHOLD)
+                for statement, count in repeated.items():
+                    logger.warning(
+                        f"Suspected N+1 on {scope['method']} {route_path}: "
+                        f"statement ran {count} times: {statement}"
+                    )
+                route_query_stats.add(f"{scope['method']} {route_path}", stats, len(repeated))
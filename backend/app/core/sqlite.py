@@ -0,0 +1,69 @@
+"""
+SQLite engine profile for file databases.
+
+Every connection gets the pragmas below. The primary engine is the single
+writer: one pooled connection, so write transactions queue in the pool
+instead of failing with "database is locked". With WAL, readers don't block
+the writer or each other, so read-only sessions use a separate engine with a
+pool of ``query_only`` connections.
+
+Enabled with ``SQLITE_TUNED`` (off by default). The single writer
+connection is shared by request sessions (``get_db``) and every background
+writer (touch buffer, activity log, token sweeper). Holding a primary
+session while opening another one, e.g. ``AsyncSessionLocal()`` inside a
+``get_db`` handler, therefore waits ``DATABASE_POOL_TIMEOUT`` for a
+connection that is never released, then fails.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from app.core.config import settings
+from app.core.db_pool import InstrumentedPool, instrument_engine
+
+
+def is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def sqlite_pragmas(query_only: bool) -> list:
+    pragmas = [
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",  # negative: KiB, not pages
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if query_only:
+        pragmas.append("PRAGMA query_only=ON")
+    else:
+        # The journal mode is stored in the database file, so the writer sets it
+        pragmas.insert(0, f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    return pragmas
+
+
+def create_sqlite_engine(url: str, query_only: bool = False) -> AsyncEngine:
+    """Writer engine (one connection) or reader engine for a SQLite file."""
+    sqlite_engine = create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=settings.SQLITE_READER_POOL_SIZE if query_only else 1,
+        max_overflow=0,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        connect_args={"check_same_thread": False},
+    )
+    pragmas = sqlite_pragmas(query_only)
+
+    @event.listens_for(sqlite_engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    instrument_engine(sqlite_engine)
+    return sqlite_engine
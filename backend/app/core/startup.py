@@ -0,0 +1,46 @@
+"""
+Startup phase timing.
+
+Each phase of the lifespan startup is wrapped in ``startup_timer.phase`` (or
+``timed`` for coroutines run concurrently), so slow boots can be traced to
+a phase from the log or from ``/metrics``.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.total_ms = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 2)
+            logger.info(f"Startup phase {name}: {self.phases[name]:.1f} ms")
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        with self.phase(name):
+            return await awaitable
+
+    def finish(self) -> None:
+        self.total_ms = round((time.perf_counter() - self.started) * 1000, 2)
+        phases = ", ".join(f"{name} {ms:.1f} ms" for name, ms in self.phases.items())
+        print(f"Startup completed in {self.total_ms:.1f} ms ({phases})")
+
+    def stats(self) -> dict:
+        return {"total_ms": self.total_ms, "phases_ms": dict(self.phases)}
+
+
+startup_timer = StartupTimer()
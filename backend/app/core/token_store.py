@@ -0,0 +1,134 @@
+"""
+Refresh-token family store.
+
+Every login starts a token family. The store keeps one key per family holding
+the id (``jti``) of the only refresh token that may currently be exchanged.
+Refreshing compares and swaps that id in a single O(1) operation; presenting
+an older token of the family means it was stolen or replayed, so the whole
+family is revoked and its holder has to log in again.
+
+A family expires ``ttl_seconds`` after login; rotating does not extend it.
+Families are also indexed by subject (the user's email) so all of a user's
+sessions can be revoked at once, e.g. when the password changes.
+"""
+import enum
+import time
+from typing import Callable, Dict, Set, Tuple
+from app.core.config import settings
+from app.core.redis import get_redis
+
+
+class RotationResult(str, enum.Enum):
+    ROTATED = "rotated"
+    UNKNOWN = "unknown"  # family expired, revoked or never issued
+    REUSED = "reused"  # stale token presented, family has been revoked
+
+
+class InMemoryTokenFamilyStore:
+    """Process-local store, used in tests and single-process development."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._families: Dict[str, Tuple[str, float]] = {}
+        self._subjects: Dict[str, Set[str]] = {}
+
+    def _current(self, family_id: str):
+        entry = self._families.get(family_id)
+        if entry is None:
+            return None
+        token_id, expires_at = entry
+        if expires_at <= self._clock():
+            del self._families[family_id]
+            return None
+        return token_id
+
+    async def create_family(self, family_id: str, token_id: str, ttl_seconds: int, subject: str) -> None:
+        self._families[family_id] = (token_id, self._clock() + ttl_seconds)
+        # Forget the subject's expired families while we're here
+        families = {f for f in self._subjects.get(subject, ()) if self._current(f) is not None}
+        families.add(family_id)
+        self._subjects[subject] = families
+
+    async def rotate(self, family_id: str, token_id: str, new_token_id: str) -> RotationResult:
+        current = self._current(family_id)
+        if current is None:
+            return RotationResult.UNKNOWN
+        if current != token_id:
+            del self._families[family_id]
+            return RotationResult.REUSED
+        self._families[family_id] = (new_token_id, self._families[family_id][1])
+        return RotationResult.ROTATED
+
+    async def revoke_family(self, family_id: str) -> None:
+        self._families.pop(family_id, None)
+
+    async def revoke_subject(self, subject: str) -> None:
+        for family_id in self._subjects.pop(subject, ()):
+            self._families.pop(family_id, None)
+
+
+# Compare-and-swap of the current token id, atomic on the Redis server.
+# KEEPTTL leaves the family's original expiry in place.
+_ROTATE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return 0
+end
+if current == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'KEEPTTL')
+    return 1
+end
+redis.call('DEL', KEYS[1])
+return -1
+"""
+
+
+class RedisTokenFamilyStore:
+    """Store shared by all workers, kept in ``settings.REDIS_URL``."""
+
+    key_prefix = "refresh_family:"
+    subject_prefix = "refresh_subject:"
+
+    def __init__(self):
+        self._rotate_script = None
+
+    def _key(self, family_id: str) -> str:
+        return f"{self.key_prefix}{family_id}"
+
+    def _subject_key(self, subject: str) -> str:
+        return f"{self.subject_prefix}{subject}"
+
+    async def create_family(self, family_id: str, token_id: str, ttl_seconds: int, subject: str) -> None:
+        # The subject index lives as long as the newest family
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.set(self._key(family_id), token_id, ex=ttl_seconds)
+            pipe.sadd(self._subject_key(subject), family_id)
+            pipe.expire(self._subject_key(subject), ttl_seconds)
+            await pipe.execute()
+
+    async def rotate(self, family_id: str, token_id: str, new_token_id: str) -> RotationResult:
+        if self._rotate_script is None:
+            self._rotate_script = get_redis().register_script(_ROTATE_SCRIPT)
+        result = await self._rotate_script(
+            keys=[self._key(family_id)],
+            args=[token_id, new_token_id],
+        )
+        if result == 1:
+            return RotationResult.ROTATED
+        if result == -1:
+            return RotationResult.REUSED
+        return RotationResult.UNKNOWN
+
+    async def revoke_family(self, family_id: str) -> None:
+        await get_redis().delete(self._key(family_id))
+
+    async def revoke_subject(self, subject: str) -> None:
+        redis = get_redis()
+        family_ids = await redis.smembers(self._subject_key(subject))
+        await redis.delete(self._subject_key(subject), *[self._key(family_id) for family_id in family_ids])
+
+
+if settings.token_store_backend == "memory":
+    token_family_store = InMemoryTokenFamilyStore()
+else:
+    token_family_store = RedisTokenFamilyStore()
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -5,9 +6,23 @@ from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from pathlib import Path
 from app.core.config import settings
-from app.core.database import init_db, close_db
+from app.core.database import close_db, read_router, start_pool_liveness, get_pool_stats, warm_up_pools
 from app.api.api import api_router
 from app.core.upload import setup_upload_directories
+from app.core.security import shutdown_password_hasher, get_password_hash_pool_stats, token_cache
+from app.core.principal import principal_cache, prefill_principal_cache
+from app.core.redis import check_redis, close_redis
+from app.core.jwt_keys import is_asymmetric, key_ring
+from app.core.rate_limit import login_limiter
+from app.services.auth_tokens import start_auth_token_sweeper, stop_auth_token_sweeper
+from app.core.http_client import init_http_client, close_http_client
+from app.core.google_oauth import google_cert_store
+from app.services.touch_buffer import touch_buffer
+from app.services.activity_log import activity_log
+from app.core.revocation import revocation_list, start_revocation_listener, stop_revocation_listener
+from app.core.sql_stats import QueryStatsMiddleware, route_query_stats
+from app.core.schema import check_schema_version
+from app.core.startup import startup_timer
 
 
 @asynccontextmanager
@@ -16,19 +31,80 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for startup and shutdown events.
     """
     # Startup
-    try:
-        await init_db()
-        print("Database initialized")
-    except Exception as e:
-        print(f"Warning: Could not initialize database: {e}")
+    with startup_timer.phase("upload directories"):
+        setup_upload_directories()
+
+    # Settings whose backend is Redis
+    redis_required_by = [
+        name for name, backend in (
+            ("TOKEN_STORE_BACKEND", settings.token_store_backend),
+            ("RATE_LIMIT_BACKEND", settings.rate_limit_backend),
+        )
+        if backend == "redis"
+    ]
+
+    # Independent startup work runs concurrently
+    schema_check, pool_warmup, prefill, http_client, redis_check = await asyncio.gather(
+        startup_timer.timed("schema check", check_schema_version()),
+        startup_timer.timed("pool warmup", warm_up_pools(settings.DATABASE_POOL_WARMUP_CONNECTIONS)),
+        startup_timer.timed("principal cache prefill", prefill_principal_cache(settings.PRINCIPAL_CACHE_PREFILL)),
+        # Shared HTTP client for OAuth providers
+        startup_timer.timed("http client", init_http_client()),
+        startup_timer.timed("redis check", check_redis(redis_required_by)),
+        return_exceptions=True,
+    )
+    for failure in (schema_check, http_client, redis_check):
+        if isinstance(failure, Exception):
+            raise failure
+    if isinstance(pool_warmup, Exception):
+        print(f"Warning: Could not connect to database: {pool_warmup}")
         print("Running without database connection")
+    if isinstance(prefill, Exception):
+        print(f"Warning: Could not prefill principal cache: {prefill}")
+
+    with startup_timer.phase("background tasks"):
+        # Check read replica and pooled connection health in the background
+        read_router.start()
+        start_pool_liveness()
+
+        if settings.GOOGLE_CLIENT_ID:
+            google_cert_store.start()
 
-    # Setup upload directories
-    setup_upload_directories()
-    print("Upload directories initialized")
+        # Receive token revocations from other workers
+        start_revocation_listener()
+
+        # Remove expired password reset / verification tokens
+        start_auth_token_sweeper()
+
+        # Batched last_login / last_seen_at writes
+        touch_buffer.start()
+
+        # Batched activity log writes and monthly partition upkeep
+        activity_log.start()
+
+    startup_timer.finish()
 
     yield
     # Shutdown
+    try:
+        await touch_buffer.stop()
+    except Exception as e:
+        print(f"Warning: Could not flush buffered user updates: {e}")
+    try:
+        await activity_log.stop()
+    except Exception as e:
+        print(f"Warning: Could not flush buffered activity logs: {e}")
+    await stop_auth_token_sweeper()
+    await stop_revocation_listener()
+    await google_cert_store.stop()
+    await close_http_client()
+    shutdown_password_hasher()
+
+    try:
+        await close_redis()
+    except Exception:
+        pass
+
     try:
         await close_db()
         print("Database connections closed")
@@ -59,6 +135,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL counts and timing
+app.add_middleware(QueryStatsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -86,6 +165,32 @@ async def health_check():
         }
     )
 
+@app.get("/.well-known/jwks.json")
+async def jwks():
+    keys = key_ring.jwks() if is_asymmetric(settings.JWT_ALGORITHM) else {"keys": []}
+    return JSONResponse(
+        content=keys,
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
+
+@app.get("/metrics")
+async def metrics():
+    return JSONResponse(
+        content={
+            "password_hash_pool": get_password_hash_pool_stats(),
+            "principal_cache": principal_cache.stats(),
+            "token_cache": token_cache.stats(),
+            "token_revocation": revocation_list.stats(),
+            "login_rate_limit": login_limiter.stats(),
+            "touch_buffer": touch_buffer.stats(),
+            "activity_log": activity_log.stats(),
+            "startup": startup_timer.stats(),
+            "database_pool": get_pool_stats(),
+            "sql": route_query_stats.stats(),
+            "read_replicas": read_router.stats(),
+        }
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
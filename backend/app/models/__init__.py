@@ -1,4 +1,6 @@
 from app.models.user import User, UserRole
+from app.models.auth_token import AuthToken, TokenPurpose
+from app.models.oauth_identity import OAuthIdentity
 from app.models.organization import Organization, OrganizationMember, MemberRole
 from app.models.subscription import (
     Subscription,
@@ -8,10 +10,14 @@ from app.models.subscription import (
     InvoiceStatus,
     PaymentMethod,
 )
+from app.models.activity_log import ActivityLog
 
 __all__ = [
     "User",
     "UserRole",
+    "AuthToken",
+    "TokenPurpose",
+    "OAuthIdentity",
     "Organization",
     "OrganizationMember",
     "MemberRole",
@@ -21,4 +27,5 @@ __all__ = [
     "Invoice",
     "InvoiceStatus",
     "PaymentMethod",
+    "ActivityLog",
 ]
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from app.core.database import Base
+from app.models.types import UUIDKey, new_id
+
+
+Details = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+
+class ActivityLog(Base):
+    """
+    User action, optionally within an organization.
+
+    On PostgreSQL the table is range-partitioned by month on ``created_at``
+    (partitions are managed by app.services.activity_log), so the partition
+    key is part of the primary key.
+    """
+    __tablename__ = "activity_logs"
+
+    id = Column(UUIDKey, primary_key=True, default=new_id)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+    organization_id = Column(UUIDKey, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=True)
+    user_id = Column(UUIDKey, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    action_type = Column(String(100), nullable=False)
+    action_description = Column(String, nullable=True)
+    resource_type = Column(String(100), nullable=True)
+    resource_id = Column(String, nullable=True)
+    ip_address = Column(String(45), nullable=True)
+    user_agent = Column(String, nullable=True)
+    details = Column("metadata", Details, nullable=True)
+
+    __table_args__ = (
+        Index("ix_activity_logs_organization_id_created_at", "organization_id", "created_at"),
+        Index("ix_activity_logs_user_id_created_at", "user_id", "created_at"),
+        Index("ix_activity_logs_created_at", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    def __repr__(self):
+        return f"<ActivityLog {self.action_type} by {self.user_id}>"
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Index
+from datetime import datetime
+import enum
+from app.core.database import Base
+from app.models.types import UUIDKey
+
+
+class TokenPurpose(str, enum.Enum):
+    PASSWORD_RESET = "password_reset"
+    EMAIL_VERIFICATION = "email_verification"
+
+
+class AuthToken(Base):
+    """
+    Single-use token sent to a user by email.
+
+    Only the SHA-256 digest of the token is stored, and it is the primary
+    key, so a token is looked up with one index probe.
+    """
+    __tablename__ = "auth_tokens"
+
+    token_hash = Column(String(64), primary_key=True)
+    user_id = Column(UUIDKey, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    purpose = Column(Enum(TokenPurpose), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_auth_tokens_user_id_purpose", "user_id", "purpose"),
+    )
+
+    def __repr__(self):
+        return f"<AuthToken {self.purpose} for {self.user_id}>"
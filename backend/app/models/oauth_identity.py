@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.core.database import Base
+from app.models.types import UUIDKey
+
+
+class OAuthIdentity(Base):
+    """
+    Link between a user and an account at an external identity provider.
+
+    Keyed by (provider, subject), so callback lookups are a primary-key probe.
+    """
+    __tablename__ = "oauth_identities"
+
+    provider = Column(String, primary_key=True)  # 'google', 'github', etc.
+    subject = Column(String, primary_key=True)  # provider's user ID
+    user_id = Column(UUIDKey, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    user = relationship("User", back_populates="oauth_identities")
+
+    def __repr__(self):
+        return f"<OAuthIdentity {self.provider}:{self.subject}>"
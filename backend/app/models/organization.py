@@ -1,9 +1,9 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
-import uuid
 import enum
 from app.core.database import Base
+from app.models.types import UUIDKey, new_id
 
 
 class MemberRole(str, enum.Enum):
@@ -15,10 +15,10 @@ class MemberRole(str, enum.Enum):
 class Organization(Base):
     __tablename__ = "organizations"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDKey, primary_key=True, default=new_id)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
-    owner_id = Column(String, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(UUIDKey, ForeignKey("users.id"), nullable=False, index=True)
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -34,13 +34,18 @@ class Organization(Base):
 class OrganizationMember(Base):
     __tablename__ = "organization_members"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    organization_id = Column(String, ForeignKey("organizations.id"), nullable=False)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    id = Column(UUIDKey, primary_key=True, default=new_id)
+    organization_id = Column(UUIDKey, ForeignKey("organizations.id"), nullable=False)
+    user_id = Column(UUIDKey, ForeignKey("users.id"), nullable=False, index=True)
     role = Column(Enum(MemberRole), default=MemberRole.MEMBER)
 
     joined_at = Column(DateTime, default=datetime.utcnow)
 
+    # Also serves lookups by organization_id alone
+    __table_args__ = (
+        UniqueConstraint("organization_id", "user_id", name="uq_organization_members_organization_id_user_id"),
+    )
+
     # Relationships
     organization = relationship("Organization", back_populates="members")
     user = relationship("User", back_populates="organizations")
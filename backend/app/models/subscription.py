@@ -1,9 +1,9 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Numeric, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Numeric, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
-import uuid
 import enum
 from app.core.database import Base
+from app.models.types import UUIDKey, new_id
 
 
 class SubscriptionStatus(str, enum.Enum):
@@ -32,8 +32,8 @@ class InvoiceStatus(str, enum.Enum):
 class Subscription(Base):
     __tablename__ = "subscriptions"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, ForeignKey("users.id"), nullable=False, unique=True)
+    id = Column(UUIDKey, primary_key=True, default=new_id)
+    user_id = Column(UUIDKey, ForeignKey("users.id"), nullable=False, unique=True)
     stripe_subscription_id = Column(String, unique=True, nullable=True)
 
     plan_type = Column(Enum(PlanType), nullable=False)
@@ -47,6 +47,10 @@ class Subscription(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_subscriptions_status_current_period_end", "status", "current_period_end"),
+    )
+
     # Relationships
     user = relationship("User", back_populates="subscription")
     invoices = relationship("Invoice", back_populates="subscription", cascade="all, delete-orphan")
@@ -58,8 +62,8 @@ class Subscription(Base):
 class Invoice(Base):
     __tablename__ = "invoices"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    subscription_id = Column(String, ForeignKey("subscriptions.id"), nullable=False)
+    id = Column(UUIDKey, primary_key=True, default=new_id)
+    subscription_id = Column(UUIDKey, ForeignKey("subscriptions.id"), nullable=False)
     stripe_invoice_id = Column(String, unique=True, nullable=True)
 
     amount = Column(Numeric(10, 2), nullable=False)
@@ -73,6 +77,11 @@ class Invoice(Base):
     paid_at = Column(DateTime, nullable=True)
     due_date = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # A subscription's invoices, newest first (keyset pagination)
+        Index("ix_invoices_subscription_id_created_at_id", "subscription_id", "created_at", "id"),
+    )
+
     # Relationships
     subscription = relationship("Subscription", back_populates="invoices")
 
@@ -83,8 +92,8 @@ class Invoice(Base):
 class PaymentMethod(Base):
     __tablename__ = "payment_methods"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    id = Column(UUIDKey, primary_key=True, default=new_id)
+    user_id = Column(UUIDKey, ForeignKey("users.id"), nullable=False, index=True)
     stripe_payment_method_id = Column(String, unique=True, nullable=False)
 
     type = Column(String, nullable=False)  # card, bank_account, etc.
@@ -0,0 +1,61 @@
+"""
+Shared column types.
+
+Primary keys are UUIDv7 (RFC 9562): a 48-bit millisecond timestamp followed
+by random bits, so new keys land at the right-hand edge of the index instead
+of at random pages. They are stored as native ``uuid`` on PostgreSQL and as
+16-byte blobs elsewhere, while the application keeps handling them as the
+usual ``"xxxxxxxx-xxxx-..."`` strings.
+"""
+import os
+import time
+import uuid
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.types import TypeDecorator
+
+
+def uuid7() -> uuid.UUID:
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76  # version
+    value |= ((rand >> 62) & 0xFFF) << 64  # rand_a
+    value |= 0b10 << 62  # variant
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF  # rand_b
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    """Default for primary key columns."""
+    return str(uuid7())
+
+
+class UUIDKey(TypeDecorator):
+    """UUID column that accepts and returns strings."""
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(PG_UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(value)
+        return value if dialect.name == "postgresql" else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(bytes=bytes(value)))
+
+    @property
+    def python_type(self):
+        return str
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
-import uuid
 import enum
 from app.core.database import Base
+from app.models.types import UUIDKey, new_id
 
 
 class UserRole(str, enum.Enum):
@@ -15,7 +15,7 @@ class UserRole(str, enum.Enum):
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDKey, primary_key=True, default=new_id)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=True)  # Nullable for OAuth users
     full_name = Column(String, nullable=False)
@@ -24,17 +24,14 @@ class User(Base):
     profile_picture = Column(String, nullable=True)  # URL or file path
     phone = Column(String, nullable=True)
 
-    # OAuth fields
-    google_id = Column(String, unique=True, nullable=True, index=True)
-    oauth_provider = Column(String, nullable=True)  # 'google', 'github', etc.
+    # OAuth fields (provider accounts are linked in oauth_identities)
+    oauth_provider = Column(String, nullable=True)  # provider of the most recent link
 
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
     role = Column(Enum(UserRole), default=UserRole.USER)
 
     verification_token = Column(String, nullable=True)
-    reset_token = Column(String, nullable=True)
-    reset_token_expires = Column(DateTime, nullable=True)
 
     # Two-Factor Authentication
     two_factor_enabled = Column(Boolean, default=False)
@@ -43,11 +40,25 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
+    last_seen_at = Column(DateTime, nullable=True)  # written in batches by the touch buffer
+
+    __table_args__ = (
+        # Only unverified users carry a token
+        Index(
+            "ix_users_verification_token",
+            "verification_token",
+            postgresql_where=verification_token.isnot(None),
+            sqlite_where=verification_token.isnot(None),
+        ),
+        # Keyset pagination of the user list
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     # Relationships
     organizations = relationship("OrganizationMember", back_populates="user", cascade="all, delete-orphan")
     owned_organizations = relationship("Organization", back_populates="owner", cascade="all, delete-orphan")
     subscription = relationship("Subscription", back_populates="user", uselist=False, cascade="all, delete-orphan")
+    oauth_identities = relationship("OAuthIdentity", back_populates="user", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<User {self.email}>"
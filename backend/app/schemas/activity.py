@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class ActivityLog(BaseModel):
+    id: str
+    organization_id: Optional[str] = None
+    user_id: Optional[str] = None
+    action_type: str
+    action_description: Optional[str] = None
+    resource_type: Optional[str] = None
+    resource_id: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
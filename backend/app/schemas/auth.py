@@ -16,6 +16,9 @@ class TokenResponse(BaseModel):
     refresh_token: str
     token_type: str = "bearer"
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class PasswordReset(BaseModel):
     email: EmailStr
 
@@ -20,7 +20,7 @@ class Subscription(SubscriptionBase):
 
 class Invoice(BaseModel):
     id: str
-    user_id: str
+    subscription_id: str
     amount: Decimal
     status: str
     invoice_url: Optional[str] = None
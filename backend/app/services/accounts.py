@@ -0,0 +1,154 @@
+"""
+Provider-agnostic OAuth account linking.
+
+An OAuth login either finds the user already linked to (provider, subject),
+links the provider account to the user with the same email, or creates a new
+user, and always records the login time. On PostgreSQL all of that is a
+single statement built from data-modifying CTEs; SQLite has no writable CTEs,
+so it runs the same upserts as separate statements.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import exists, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.oauth_identity import OAuthIdentity
+from app.models.types import new_id
+from app.models.user import User, UserRole
+
+
+def _new_user_values(
+    provider: str,
+    email: str,
+    full_name: str,
+    profile_picture: Optional[str],
+    now: datetime,
+) -> dict:
+    return {
+        "id": new_id(),
+        "email": email,
+        "full_name": full_name,
+        "oauth_provider": provider,
+        "profile_picture": profile_picture,
+        "hashed_password": None,  # No password for OAuth users
+        "is_active": True,
+        "is_verified": True,  # Provider accounts are pre-verified
+        "role": UserRole.USER,
+        "two_factor_enabled": False,
+        "created_at": now,
+        "updated_at": now,
+        "last_login": now,
+    }
+
+
+def _link_existing_email(insert_stmt):
+    """ON CONFLICT (email): link the provider to the existing user."""
+    excluded = insert_stmt.excluded
+    return insert_stmt.on_conflict_do_update(
+        index_elements=[User.email],
+        set_={
+            "oauth_provider": excluded.oauth_provider,
+            "profile_picture": func.coalesce(User.profile_picture, excluded.profile_picture),
+            "is_verified": True,
+            "last_login": excluded.last_login,
+            "updated_at": excluded.updated_at,
+        },
+    )
+
+
+async def _link_postgresql(db: AsyncSession, provider: str, subject: str, values: dict) -> Row:
+    now = values["last_login"]
+
+    existing = (
+        select(OAuthIdentity.user_id)
+        .where(OAuthIdentity.provider == provider, OAuthIdentity.subject == subject)
+        .cte("existing")
+    )
+
+    touched = (
+        update(User)
+        .where(User.id == existing.c.user_id)
+        .values(last_login=now)
+        .returning(User.id, User.email)
+        .cte("touched")
+    )
+
+    columns = list(values)
+    new_user = select(*[literal(values[name], User.__table__.c[name].type) for name in columns]).where(
+        ~exists(select(existing.c.user_id))
+    )
+    upserted = (
+        _link_existing_email(pg_insert(User).from_select(columns, new_user))
+        .returning(User.id, User.email)
+        .cte("upserted")
+    )
+
+    linked = (
+        pg_insert(OAuthIdentity)
+        .from_select(
+            ["provider", "subject", "user_id", "created_at"],
+            select(literal(provider), literal(subject), upserted.c.id, literal(now)),
+        )
+        .on_conflict_do_nothing(index_elements=[OAuthIdentity.provider, OAuthIdentity.subject])
+        .cte("linked")
+    )
+
+    statement = (
+        select(touched.c.id, touched.c.email)
+        .union_all(select(upserted.c.id, upserted.c.email))
+        .add_cte(linked)
+    )
+    result = await db.execute(statement)
+    return result.one()
+
+
+async def _link_sqlite(db: AsyncSession, provider: str, subject: str, values: dict) -> Row:
+    now = values["last_login"]
+
+    result = await db.execute(
+        update(User)
+        .where(
+            User.id == select(OAuthIdentity.user_id)
+            .where(OAuthIdentity.provider == provider, OAuthIdentity.subject == subject)
+            .scalar_subquery()
+        )
+        .values(last_login=now)
+        .returning(User.id, User.email)
+    )
+    account = result.one_or_none()
+    if account is not None:
+        return account
+
+    result = await db.execute(
+        _link_existing_email(sqlite_insert(User).values(**values)).returning(User.id, User.email)
+    )
+    account = result.one()
+
+    await db.execute(
+        sqlite_insert(OAuthIdentity)
+        .values(provider=provider, subject=subject, user_id=account.id, created_at=now)
+        .on_conflict_do_nothing(index_elements=["provider", "subject"])
+    )
+    return account
+
+
+async def link_oauth_account(
+    db: AsyncSession,
+    provider: str,
+    subject: str,
+    email: str,
+    full_name: str,
+    profile_picture: Optional[str] = None,
+) -> Row:
+    """
+    Find, link or create the user for a provider account and record the login.
+
+    Returns a row with the user's ``id`` and ``email``. The caller commits.
+    """
+    values = _new_user_values(provider, email, full_name, profile_picture, datetime.utcnow())
+
+    if db.get_bind().dialect.name == "postgresql":
+        return await _link_postgresql(db, provider, subject, values)
+    return await _link_sqlite(db, provider, subject, values)
@@ -0,0 +1,376 @@
+"""
+Activity logging.
+
+Endpoints record events with ``activity_log.log_activity``, which only
+appends to an in-memory queue; a background task writes the queue every
+``ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS`` (or as soon as ``ACTIVITY_LOG_BUFFER_MAX_PENDING`` events are waiting) with
+multi-row INSERTs of up to ``ACTIVITY_LOG_INSERT_BATCH_SIZE`` rows. Events
+still queued are written on shutdown; a crash loses at most one interval.
+
+On PostgreSQL the table is range-partitioned by month on ``created_at``.
+The same task creates partitions ``ACTIVITY_LOG_PARTITIONS_AHEAD`` months in
+advance and drops partitions older than ``ACTIVITY_LOG_RETENTION_MONTHS``,
+which is a catalog change instead of a mass DELETE. A DEFAULT partition
+catches rows outside the prepared range so they are never rejected. Reads
+always carry a bounded ``created_at`` window so the planner only scans the
+partitions it overlaps. SQLite has no partitioning; retention there is a
+DELETE.
+"""
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Union
+from uuid import UUID
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import Select
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.models.activity_log import ActivityLog
+from app.models.types import new_id
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_MODELS = (ActivityLog,)
+PARTITION_SUFFIX = re.compile(r"_(\d{4})_(\d{2})$")
+
+
+def month_start(at: datetime) -> datetime:
+    return at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def is_partition(name: str) -> bool:
+    """True for the DEFAULT and monthly partitions of the partitioned tables."""
+    return any(
+        re.fullmatch(rf"{model.__tablename__}_(default|\d{{4}}_\d{{2}})", name)
+        for model in PARTITIONED_MODELS
+    )
+
+
+async def _partitions(conn, table: str) -> List[str]:
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": table},
+    )
+    return result.scalars().all()
+
+
+async def _create_partition(conn, table: str, month: datetime) -> None:
+    name = partition_name(table, month)
+    default = f"{table}_default"
+    bounds = f"FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    in_month = f"created_at >= '{month:%Y-%m-%d}' AND created_at < '{add_months(month, 1):%Y-%m-%d}'"
+
+    stranded = await conn.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_month})"))
+    if not stranded:
+        await conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        return
+
+    # The DEFAULT partition already holds rows for this month (maintenance
+    # fell behind), which PostgreSQL would reject the new partition for:
+    # take DEFAULT out, move its rows for the month over, then put it back.
+    await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    await conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+    moved = await conn.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE {in_month} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ))
+    await conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    logger.info(f"Moved {moved.rowcount} rows from {default} into {name}")
+
+
+async def _create_partitions(conn, table: str, first: datetime, count: int) -> int:
+    await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+    existing = set(await _partitions(conn, table))
+
+    created = 0
+    for offset in range(count):
+        month = add_months(first, offset)
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        try:
+            # A failure only rolls back this partition, not the whole run
+            async with conn.begin_nested():
+                await _create_partition(conn, table, month)
+        except Exception as e:
+            logger.warning(f"Could not create partition {name}: {e}")
+            continue
+        created += 1
+    return created
+
+
+async def _drop_partitions(conn, table: str, cutoff: datetime) -> int:
+    dropped = 0
+    for name in await _partitions(conn, table):
+        match = PARTITION_SUFFIX.search(name)
+        if match and datetime(int(match.group(1)), int(match.group(2)), 1) < cutoff:
+            await conn.execute(text(f"DROP TABLE {name}"))
+            dropped += 1
+    return dropped
+
+
+async def maintain_log_storage(now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Create upcoming monthly partitions and apply the retention period.
+
+    Safe to run from every worker: on PostgreSQL an advisory lock serializes
+    concurrent runs.
+    """
+    current = month_start(now or datetime.utcnow())
+    retention = settings.ACTIVITY_LOG_RETENTION_MONTHS
+    cutoff = add_months(current, -retention) if retention > 0 else None
+    created = dropped = 0
+
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('activity_log_partitions'))"))
+            for model in PARTITIONED_MODELS:
+                table = model.__tablename__
+                created += await _create_partitions(conn, table, current, settings.ACTIVITY_LOG_PARTITIONS_AHEAD + 1)
+                if cutoff is not None:
+                    dropped += await _drop_partitions(conn, table, cutoff)
+        elif cutoff is not None:
+            for model in PARTITIONED_MODELS:
+                result = await conn.execute(delete(model).where(model.created_at < cutoff))
+                dropped += result.rowcount
+
+    if created or dropped:
+        logger.info(f"Log storage maintenance: {created} partitions created, {dropped} partitions/rows dropped")
+    return {"created": created, "dropped": dropped}
+
+
+def query_window(since: Optional[datetime], until: Optional[datetime], default_days: int = 30) -> Tuple[datetime, datetime]:
+    """
+    Resolve a ``[since, until)`` window in naive UTC, defaulting to the last
+    ``default_days``. Raises ``ValueError`` if it is empty or wider than
+    ``ACTIVITY_LOG_MAX_QUERY_DAYS``.
+    """
+    def naive_utc(at: datetime) -> datetime:
+        return at.astimezone(timezone.utc).replace(tzinfo=None) if at.tzinfo else at
+
+    until = naive_utc(until) if until else datetime.utcnow()
+    since = naive_utc(since) if since else until - timedelta(days=default_days)
+    if since >= until:
+        raise ValueError("'since' must be before 'until'")
+    if until - since > timedelta(days=settings.ACTIVITY_LOG_MAX_QUERY_DAYS):
+        raise ValueError(f"Time window may span at most {settings.ACTIVITY_LOG_MAX_QUERY_DAYS} days")
+    return since, until
+
+
+def activity_query(
+    since: datetime,
+    until: datetime,
+    organization_id: Optional[Union[str, UUID]] = None,
+    user_id: Optional[Union[str, UUID]] = None,
+    action_type: Optional[str] = None,
+    limit: int = 50,
+) -> Select:
+    """Newest activity in ``[since, until)``; the bounds prune partitions."""
+    stmt = select(ActivityLog).where(ActivityLog.created_at >= since, ActivityLog.created_at < until)
+    if organization_id is not None:
+        stmt = stmt.where(ActivityLog.organization_id == organization_id)
+    if user_id is not None:
+        stmt = stmt.where(ActivityLog.user_id == user_id)
+    if action_type is not None:
+        stmt = stmt.where(ActivityLog.action_type == action_type)
+    return stmt.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(limit)
+
+
+class ActivityLogBuffer:
+    def __init__(
+        self,
+        flush_interval: float,
+        max_pending: int,
+        max_size: int,
+        batch_size: int,
+        maintenance_interval: float,
+    ):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.maintenance_interval = maintenance_interval
+        self._pending: Dict[type, List[dict]] = {model: [] for model in PARTITIONED_MODELS}
+        self._flush_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.events = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.dropped = 0
+        self.last_flush_size = 0
+        self.last_flush_duration_seconds = 0.0
+        self.last_maintenance: Dict[str, int] = {}
+        self.errors = 0
+
+    @property
+    def pending(self) -> int:
+        return sum(len(rows) for rows in self._pending.values())
+
+    def _enqueue(self, model: type, row: dict) -> None:
+        row["id"] = new_id()
+        row["created_at"] = datetime.utcnow()
+        rows = self._pending[model]
+        rows.append(row)
+        if len(rows) > self.max_size:
+            del rows[0]
+            self.dropped += 1
+        self.events += 1
+
+        if self.pending >= self.max_pending:
+            self._flush_requested.set()
+
+    def log_activity(
+        self,
+        action_type: str,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        description: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        details: Optional[dict] = None,
+    ) -> None:
+        """Queue a user action such as ``user.login`` or ``team.invite``."""
+        self._enqueue(ActivityLog, {
+            "action_type": action_type,
+            "user_id": user_id,
+            "organization_id": organization_id,
+            "action_description": description,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "details": details,
+        })
+
+    async def _insert(self, model: type, rows: List[dict]) -> int:
+        """Insert rows with one statement; on a constraint violation, row by row."""
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(insert(model).values(rows))
+                await session.commit()
+            return len(rows)
+        except IntegrityError:
+            if len(rows) == 1:
+                raise
+
+        # Usually a reference to a user or organization deleted meanwhile;
+        # retrying the whole batch would fail forever, so only that row goes.
+        inserted = 0
+        for row in rows:
+            try:
+                inserted += await self._insert(model, [row])
+            except IntegrityError as e:
+                logger.warning(f"Dropping {model.__tablename__} row {row['action_type']}: {e.orig}")
+                self.dropped += 1
+        return inserted
+
+    async def flush(self) -> int:
+        """Write all queued events. Returns the number of rows inserted."""
+        if not self.pending:
+            return 0
+
+        batch = self._pending
+        self._pending = {model: [] for model in PARTITIONED_MODELS}
+        started = time.monotonic()
+        written = 0
+        done = {model: 0 for model in PARTITIONED_MODELS}
+
+        try:
+            for model, rows in batch.items():
+                while done[model] < len(rows):
+                    chunk = rows[done[model]:done[model] + self.batch_size]
+                    written += await self._insert(model, chunk)
+                    done[model] += len(chunk)
+        except BaseException:
+            # Requeue what wasn't written (also when cancelled mid-flush on
+            # shutdown), ahead of events queued meanwhile.
+            for model, rows in batch.items():
+                requeued = rows[done[model]:] + self._pending[model]
+                overflow = max(0, len(requeued) - self.max_size)
+                self._pending[model] = requeued[overflow:]
+                self.dropped += overflow
+            self.rows_flushed += written
+            self.errors += 1
+            raise
+
+        self.flushes += 1
+        self.rows_flushed += written
+        self.last_flush_size = written
+        self.last_flush_duration_seconds = round(time.monotonic() - started, 4)
+        return written
+
+    async def _run(self) -> None:
+        next_maintenance = 0.0
+        while True:
+            if time.monotonic() >= next_maintenance:
+                try:
+                    self.last_maintenance = await maintain_log_storage()
+                except Exception as e:
+                    logger.warning(f"Log storage maintenance failed: {e}")
+                next_maintenance = time.monotonic() + self.maintenance_interval
+
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Activity log flush failed: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "events": self.events,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "dropped": self.dropped,
+            "last_flush_size": self.last_flush_size,
+            "last_flush_duration_seconds": self.last_flush_duration_seconds,
+            "last_maintenance": self.last_maintenance,
+            "errors": self.errors,
+        }
+
+
+activity_log = ActivityLogBuffer(
+    flush_interval=settings.ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.ACTIVITY_LOG_BUFFER_MAX_PENDING,
+    max_size=settings.ACTIVITY_LOG_BUFFER_MAX_SIZE,
+    batch_size=settings.ACTIVITY_LOG_INSERT_BATCH_SIZE,
+    maintenance_interval=settings.ACTIVITY_LOG_MAINTENANCE_INTERVAL_SECONDS,
+)
@@ -0,0 +1,119 @@
+"""
+Single-use email tokens (password reset, email verification).
+
+Tokens are random strings handed to the user; the database only ever sees
+their SHA-256 digest, which is the primary key of ``auth_tokens``. Expired
+rows are removed in batches by a background sweeper.
+"""
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.security import generate_reset_token
+from app.models.auth_token import AuthToken, TokenPurpose
+
+logger = logging.getLogger(__name__)
+
+
+def hash_auth_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def issue_auth_token(
+    db: AsyncSession,
+    user_id: str,
+    purpose: TokenPurpose,
+    lifetime: timedelta,
+) -> str:
+    """
+    Create a token for the user, replacing any outstanding token with the
+    same purpose. Returns the raw token; the caller commits.
+    """
+    await db.execute(
+        delete(AuthToken).where(AuthToken.user_id == user_id, AuthToken.purpose == purpose)
+    )
+
+    token = generate_reset_token()
+    db.add(AuthToken(
+        token_hash=hash_auth_token(token),
+        user_id=user_id,
+        purpose=purpose,
+        expires_at=datetime.utcnow() + lifetime,
+    ))
+    return token
+
+
+async def get_auth_token(db: AsyncSession, token: str, purpose: TokenPurpose) -> Optional[AuthToken]:
+    """
+    Look up a token by its digest. Returns None if it does not exist or was
+    issued for another purpose; expiry is left to the caller.
+    """
+    auth_token = await db.get(AuthToken, hash_auth_token(token))
+    if auth_token is None or auth_token.purpose != purpose:
+        return None
+    return auth_token
+
+
+async def sweep_expired_auth_tokens(batch_size: int = 1000) -> int:
+    """
+    Delete expired tokens in batches, committing after each batch so no
+    single transaction holds many row locks. Returns the number deleted.
+    """
+    deleted = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            expired = (
+                select(AuthToken.token_hash)
+                .where(AuthToken.expires_at < datetime.utcnow())
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = await session.execute(
+                delete(AuthToken)
+                .where(AuthToken.token_hash.in_(expired))
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+async def run_auth_token_sweeper() -> None:
+    """Periodically remove expired tokens until cancelled."""
+    while True:
+        try:
+            deleted = await sweep_expired_auth_tokens(settings.AUTH_TOKEN_SWEEP_BATCH_SIZE)
+            if deleted:
+                logger.info(f"Removed {deleted} expired auth tokens")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Auth token sweep failed: {e}")
+        await asyncio.sleep(settings.AUTH_TOKEN_SWEEP_INTERVAL_SECONDS)
+
+
+_sweeper_task: Optional[asyncio.Task] = None
+
+
+def start_auth_token_sweeper() -> None:
+    global _sweeper_task
+    if _sweeper_task is None:
+        _sweeper_task = asyncio.create_task(run_auth_token_sweeper())
+
+
+async def stop_auth_token_sweeper() -> None:
+    global _sweeper_task
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+        try:
+            await _sweeper_task
+        except asyncio.CancelledError:
+            pass
+        _sweeper_task = None
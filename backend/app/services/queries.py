@@ -0,0 +1,34 @@
+"""
+Precompiled hot queries.
+
+The user lookups below run on nearly every request. Building a ``select()``
+each time costs object construction plus a cache-key traversal before
+SQLAlchemy even finds the compiled SQL in its cache. ``lambda_stmt`` builds
+the statement once per call site and afterwards only extracts the bound
+values from the lambda's closure. Statements with a fixed shape are built
+once at import and take their parameters as bind values.
+
+On asyncpg the compiled SQL is also kept as a server-side prepared statement
+per connection (``DATABASE_PREPARED_STATEMENT_CACHE_SIZE``), so PostgreSQL
+doesn't parse and plan it again either.
+"""
+from sqlalchemy import bindparam, lambda_stmt, select
+from sqlalchemy.sql import StatementLambdaElement
+from app.core.principal import Principal
+from app.models.user import User
+
+
+def user_by_email(email: str) -> StatementLambdaElement:
+    """Full ``User`` row by email."""
+    return lambda_stmt(lambda: select(User).where(User.email == email))
+
+
+def user_id_by_email(email: str) -> StatementLambdaElement:
+    """Just the id, for existence checks."""
+    return lambda_stmt(lambda: select(User.id).where(User.email == email))
+
+
+# Columns of the authenticated principal, by email; execute with {"email": ...}
+PRINCIPAL_BY_EMAIL = select(
+    *[getattr(User, name) for name in Principal.__slots__]
+).where(User.email == bindparam("email"))
@@ -0,0 +1,175 @@
+"""
+Write-behind buffer for high-frequency user timestamp updates.
+
+Touches such as ``last_login`` and ``last_seen_at`` only need to be roughly
+current, so instead of an UPDATE (and row lock) per request they are
+collected in memory, newest timestamp per user and column, and written every
+``TOUCH_FLUSH_INTERVAL_SECONDS`` as one batched statement per column. The
+buffer is flushed once more on shutdown; a crash loses at most one interval.
+Touches don't count as profile changes, so ``updated_at`` is left alone.
+While the database is unreachable the buffer holds at most
+``TOUCH_BUFFER_MAX_SIZE`` users; touches beyond that are dropped.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import DateTime, bindparam, column, update, values
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.types import UUIDKey
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+TOUCH_COLUMNS = ("last_login", "last_seen_at")
+
+
+class TouchBuffer:
+    def __init__(self, flush_interval: float, max_pending: int, max_size: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_size = max_size
+        # (column, user_id) -> (timestamp, monotonic time first buffered)
+        self._pending: Dict[Tuple[str, str], Tuple[datetime, float]] = {}
+        self._flush_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.touches = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.last_flush_size = 0
+        self.last_flush_lag_seconds = 0.0
+        self.last_flush_duration_seconds = 0.0
+        self.dropped = 0
+        self.errors = 0
+
+    def touch(self, user_id: str, column_name: str = "last_seen_at", at: Optional[datetime] = None) -> None:
+        """Record that ``column_name`` of a user should be set to ``at`` (default now)."""
+        if column_name not in TOUCH_COLUMNS:
+            raise ValueError(f"Unsupported touch column: {column_name}")
+
+        at = at or datetime.utcnow()
+        key = (column_name, user_id)
+        current = self._pending.get(key)
+        if current is None:
+            if len(self._pending) >= self.max_size:
+                self.dropped += 1
+                return
+            self._pending[key] = (at, time.monotonic())
+        elif at > current[0]:
+            self._pending[key] = (at, current[1])
+        self.touches += 1
+
+        if len(self._pending) >= self.max_pending:
+            self._flush_requested.set()
+
+    async def flush(self) -> int:
+        """Write all pending touches. Returns the number of rows updated."""
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        started = time.monotonic()
+        oldest = min(buffered_at for _, buffered_at in batch.values())
+
+        by_column: Dict[str, list] = {}
+        for (column_name, user_id), (at, _) in batch.items():
+            by_column.setdefault(column_name, []).append((user_id, at))
+
+        try:
+            async with AsyncSessionLocal() as session:
+                dialect = session.get_bind().dialect.name
+                for column_name, rows in by_column.items():
+                    target = getattr(User, column_name)
+                    if dialect == "postgresql":
+                        # UPDATE users SET col = v.at FROM (VALUES ...) AS v(id, at) WHERE users.id = v.id
+                        touched = values(
+                            column("id", UUIDKey), column("at", DateTime), name="v"
+                        ).data(rows)
+                        await session.execute(
+                            update(User)
+                            .where(User.id == touched.c.id)
+                            .values({target: touched.c.at, User.updated_at: User.updated_at})
+                            .execution_options(synchronize_session=False)
+                        )
+                    else:
+                        await session.execute(
+                            update(User.__table__)
+                            .where(User.__table__.c.id == bindparam("user_id"))
+                            .values({column_name: bindparam("at"), "updated_at": User.__table__.c.updated_at}),
+                            [{"user_id": user_id, "at": at} for user_id, at in rows],
+                        )
+                await session.commit()
+        except BaseException:
+            # Put the batch back (also when cancelled mid-flush on shutdown),
+            # keeping any newer touches made meanwhile.
+            for key, (at, buffered_at) in batch.items():
+                current = self._pending.get(key)
+                if current is not None:
+                    at = max(at, current[0])
+                self._pending[key] = (at, buffered_at)
+            if len(self._pending) > self.max_size:
+                # Keep the most recently buffered touches
+                overflow = len(self._pending) - self.max_size
+                for key in sorted(self._pending, key=lambda k: self._pending[k][1])[:overflow]:
+                    del self._pending[key]
+                self.dropped += overflow
+            self.errors += 1
+            raise
+
+        self.flushes += 1
+        self.rows_flushed += len(batch)
+        self.last_flush_size = len(batch)
+        self.last_flush_lag_seconds = round(started - oldest, 3)
+        self.last_flush_duration_seconds = round(time.monotonic() - started, 4)
+        return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Touch buffer flush failed: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "pending": len(self._pending),
+            "oldest_pending_seconds": round(now - min((b for _, b in self._pending.values()), default=now), 3),
+            "touches": self.touches,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "last_flush_size": self.last_flush_size,
+            "last_flush_lag_seconds": self.last_flush_lag_seconds,
+            "last_flush_duration_seconds": self.last_flush_duration_seconds,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+touch_buffer = TouchBuffer(
+    flush_interval=settings.TOUCH_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.TOUCH_BUFFER_MAX_PENDING,
+    max_size=settings.TOUCH_BUFFER_MAX_SIZE,
+)
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: JWT sign and verify cost per algorithm.
+
+    python scripts/bench_jwt_algorithms.py --iterations 2000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cryptography.hazmat.primitives import serialization
+from jose import jwt
+
+from app.core.jwt_keys import generate_private_key_pem
+
+ALGORITHMS = ["HS256", "RS256", "ES256"]
+
+
+def keys_for(algorithm: str):
+    if algorithm.startswith("HS"):
+        secret = "bench-secret-" + "x" * 32
+        return secret, secret
+    private_pem = generate_private_key_pem(algorithm)
+    public_pem = serialization.load_pem_private_key(private_pem, password=None).public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem, public_pem
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    claims = {
+        "sub": "bench@example.com",
+        "type": "access",
+        "jti": "benchmark-token-id",
+        "exp": datetime.utcnow() + timedelta(minutes=30),
+    }
+
+    print(f"{'alg':6} {'sign µs':>10} {'verify µs':>10} {'size':>6}")
+    for algorithm in ALGORITHMS:
+        signing_key, verification_key = keys_for(algorithm)
+
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            token = jwt.encode(claims, signing_key, algorithm=algorithm, headers={"kid": "bench"})
+        sign = (time.perf_counter() - started) / args.iterations
+
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            jwt.decode(token, verification_key, algorithms=[algorithm])
+        verify = (time.perf_counter() - started) / args.iterations
+
+        print(f"{algorithm:6} {sign * 1e6:10.1f} {verify * 1e6:10.1f} {len(token):6d}")
+
+
+if __name__ == "__main__":
+    main()
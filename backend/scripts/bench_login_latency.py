@@ -0,0 +1,122 @@
+"""
+Benchmark: latency of cheap endpoints while logins run concurrently.
+
+Starts a burst of concurrent logins (each one a bcrypt verify) and, at the
+same time, polls /health and /api/v1/users/me. Reports p50/p95/p99 latency of
+the unrelated endpoints so event-loop blocking shows up as tail latency.
+
+Run this against a running server:
+    python scripts/bench_login_latency.py --logins 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+BASE_URL = "http://127.0.0.1:8000"
+TEST_EMAIL = "bench@example.com"
+TEST_PASSWORD = "benchpassword123"
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def ensure_user(client: httpx.AsyncClient) -> str:
+    """Register the benchmark user if needed and return an access token."""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": TEST_EMAIL,
+            "password": TEST_PASSWORD,
+            "full_name": "Bench User",
+        },
+    )
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": TEST_EMAIL, "password": TEST_PASSWORD},
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def login_worker(client: httpx.AsyncClient, queue: asyncio.Queue, statuses: dict):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        response = await client.post(
+            "/api/v1/auth/login",
+            data={"username": TEST_EMAIL, "password": TEST_PASSWORD},
+        )
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def probe(client: httpx.AsyncClient, path: str, headers: dict, samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(path, headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency + 8)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        try:
+            token = await ensure_user(client)
+        except httpx.HTTPError as e:
+            print(f"✗ Could not log in benchmark user: {e}")
+            sys.exit(1)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for _ in range(args.logins):
+            queue.put_nowait(None)
+
+        statuses: dict = {}
+        health_samples: list = []
+        me_samples: list = []
+        stop = asyncio.Event()
+        auth_headers = {"Authorization": f"Bearer {token}"}
+
+        probes = [
+            asyncio.create_task(probe(client, "/health", {}, health_samples, stop)),
+            asyncio.create_task(probe(client, "/api/v1/users/me", auth_headers, me_samples, stop)),
+        ]
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login_worker(client, queue, statuses) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*probes)
+
+    print(f"Logins: {args.logins} in {elapsed:.2f}s ({args.logins / elapsed:.1f}/s), statuses: {statuses}")
+    for name, samples in (("/health", health_samples), ("/users/me", me_samples)):
+        if not samples:
+            print(f"{name:12} no samples")
+            continue
+        print(
+            f"{name:12} n={len(samples):5d} "
+            f"p50={statistics.median(samples):7.1f}ms "
+            f"p95={percentile(samples, 95):7.1f}ms "
+            f"p99={percentile(samples, 99):7.1f}ms "
+            f"max={max(samples):7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
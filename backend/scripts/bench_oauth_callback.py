@@ -0,0 +1,110 @@
+"""
+Harness: GitHub OAuth provider latency against a local mock provider.
+
+Starts a mock GitHub (token exchange, /user, /user/emails) with a fixed
+per-request delay and runs the provider part of the GitHub callback
+(exchange_code_for_token + get_github_user_info) repeatedly, reporting
+latency percentiles. With --fresh-connections the shared client is closed
+before every callback, which reproduces the cost of new connections on each
+login (the mock is plain HTTP, so real TLS handshakes would add more).
+
+    python scripts/bench_oauth_callback.py --callbacks 200 --delay-ms 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MOCK_HOST = "127.0.0.1"
+MOCK_PORT = 8765
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-jwt-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+os.environ["GITHUB_OAUTH_BASE_URL"] = f"http://{MOCK_HOST}:{MOCK_PORT}"
+os.environ["GITHUB_API_BASE_URL"] = f"http://{MOCK_HOST}:{MOCK_PORT}"
+
+import uvicorn
+from fastapi import FastAPI
+
+from app.core.github_oauth import exchange_code_for_token, get_github_user_info
+from app.core.http_client import close_http_client
+
+
+def create_mock_provider(delay: float) -> FastAPI:
+    provider = FastAPI()
+
+    @provider.post("/login/oauth/access_token")
+    async def access_token():
+        await asyncio.sleep(delay)
+        return {"access_token": "mock-access-token", "token_type": "bearer"}
+
+    @provider.get("/user")
+    async def user():
+        await asyncio.sleep(delay)
+        return {"id": 42, "login": "octocat", "name": "Mona Octocat", "email": None,
+                "avatar_url": "https://example.com/octocat.png"}
+
+    @provider.get("/user/emails")
+    async def emails():
+        await asyncio.sleep(delay)
+        return [{"email": "octocat@example.com", "primary": True, "verified": True}]
+
+    return provider
+
+
+async def callback_once() -> float:
+    started = time.perf_counter()
+    token_data = await exchange_code_for_token("mock-code")
+    user_info = await get_github_user_info(token_data["access_token"])
+    assert user_info["email"] == "octocat@example.com"
+    return (time.perf_counter() - started) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callbacks", type=int, default=200)
+    parser.add_argument("--delay-ms", type=float, default=50)
+    parser.add_argument("--fresh-connections", action="store_true")
+    args = parser.parse_args()
+
+    server = uvicorn.Server(uvicorn.Config(
+        create_mock_provider(args.delay_ms / 1000),
+        host=MOCK_HOST,
+        port=MOCK_PORT,
+        log_level="warning",
+    ))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    try:
+        await callback_once()  # warm up
+        samples = []
+        for _ in range(args.callbacks):
+            if args.fresh_connections:
+                await close_http_client()
+            samples.append(await callback_once())
+    finally:
+        await close_http_client()
+        server.should_exit = True
+        await server_task
+
+    samples.sort()
+    mode = "fresh connections" if args.fresh_connections else "shared client"
+    print(f"{mode}: {args.callbacks} callbacks, provider delay {args.delay_ms:.0f} ms per request")
+    print(f"p50={statistics.median(samples):.1f}ms "
+          f"p95={samples[int(len(samples) * 0.95) - 1]:.1f}ms "
+          f"p99={samples[int(len(samples) * 0.99) - 1]:.1f}ms "
+          f"max={samples[-1]:.1f}ms")
+    print(f"Lower bound with concurrent profile calls: {2 * args.delay_ms:.0f} ms "
+          f"(sequential calls: {3 * args.delay_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
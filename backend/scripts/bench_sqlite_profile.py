@@ -0,0 +1,133 @@
+"""
+Benchmark: SQLite throughput with the plain engine vs the tuned profile.
+
+Runs a mixed workload (point reads by primary key and single-row updates,
+each in its own transaction) from concurrent workers against a scratch
+database file, first with the engine the app used to create (default
+journal, default pool, one engine for everything) and then with the tuned
+profile (WAL and pragmas, single writer connection, pooled query_only
+readers). Reports operations per second, read/write latency and
+"database is locked" errors.
+
+    python scripts/bench_sqlite_profile.py --workers 16 --seconds 10 --write-ratio 0.2
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-jwt-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.sqlite import create_sqlite_engine
+
+
+async def seed(url: str, rows: int) -> None:
+    seed_engine = create_async_engine(url)
+    async with seed_engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE accounts (id INTEGER PRIMARY KEY, email TEXT NOT NULL, "
+            "balance INTEGER NOT NULL, updated_at TEXT)"
+        ))
+        await conn.execute(
+            text("INSERT INTO accounts (id, email, balance) VALUES (:id, :email, 0)"),
+            [{"id": i, "email": f"user{i}@example.com"} for i in range(rows)],
+        )
+    await seed_engine.dispose()
+
+
+async def run_workload(writer, reader, args) -> dict:
+    reads, writes, locked = [], [], 0
+    deadline = time.perf_counter() + args.seconds
+
+    async def worker():
+        nonlocal locked
+        while time.perf_counter() < deadline:
+            account_id = random.randrange(args.rows)
+            started = time.perf_counter()
+            try:
+                if random.random() < args.write_ratio:
+                    async with writer.begin() as conn:
+                        await conn.execute(
+                            text("UPDATE accounts SET balance = balance + 1, "
+                                 "updated_at = datetime('now') WHERE id = :id"),
+                            {"id": account_id},
+                        )
+                    writes.append(time.perf_counter() - started)
+                else:
+                    async with reader.connect() as conn:
+                        await conn.execute(text("SELECT * FROM accounts WHERE id = :id"), {"id": account_id})
+                    reads.append(time.perf_counter() - started)
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                locked += 1
+
+    await asyncio.gather(*[worker() for _ in range(args.workers)])
+    return {"reads": reads, "writes": writes, "locked": locked}
+
+
+def report(label: str, result: dict, seconds: float) -> float:
+    def p(samples, q):
+        return sorted(samples)[int(len(samples) * q) - 1] * 1000 if samples else 0.0
+
+    ops = (len(result["reads"]) + len(result["writes"])) / seconds
+    print(f"{label}:")
+    print(f"  {ops:10,.0f} ops/s  ({len(result['reads'])} reads, {len(result['writes'])} writes, "
+          f"{result['locked']} locked errors)")
+    if result["reads"]:
+        print(f"  reads  p50={statistics.median(result['reads']) * 1000:.2f}ms p99={p(result['reads'], 0.99):.2f}ms")
+    if result["writes"]:
+        print(f"  writes p50={statistics.median(result['writes']) * 1000:.2f}ms p99={p(result['writes'], 0.99):.2f}ms")
+    return ops
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("plain", "tuned"):
+            url = f"sqlite+aiosqlite:///{os.path.join(tmp, label + '.db')}"
+            await seed(url, args.rows)
+
+            if label == "plain":
+                # What database.py created before the SQLite profile
+                writer = reader = create_async_engine(url, connect_args={"check_same_thread": False})
+            else:
+                writer = create_sqlite_engine(url)
+                reader = create_sqlite_engine(url, query_only=True)
+            # Open the writer first so the journal mode is set before readers connect
+            async with writer.connect():
+                pass
+
+            result = await run_workload(writer, reader, args)
+            results[label] = report(label, result, args.seconds)
+
+            await writer.dispose()
+            if reader is not writer:
+                await reader.dispose()
+
+    if results["plain"]:
+        print(f"✓ tuned/plain throughput: {results['tuned'] / results['plain']:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
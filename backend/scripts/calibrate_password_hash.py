@@ -0,0 +1,92 @@
+"""
+Calibrate the password hash cost for this host.
+
+Measures how long one hash takes at increasing cost factors and picks the
+highest cost that stays within the latency budget (PASSWORD_HASH_TARGET_MS
+by default). Run it on the deployment hardware and put the printed settings
+in .env; existing hashes are upgraded on each user's next login.
+
+    python scripts/calibrate_password_hash.py --scheme bcrypt --target-ms 250
+    python scripts/calibrate_password_hash.py --scheme argon2 --memory-cost 65536 --parallelism 2
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.security import build_password_context
+
+SAMPLE_PASSWORD = "calibration-password-123"
+
+
+def measure_ms(context, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash(SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate_bcrypt(target_ms: float, samples: int) -> dict:
+    best = 4
+    for rounds in range(4, 32):
+        elapsed = measure_ms(build_password_context(scheme="bcrypt", bcrypt_rounds=rounds), samples)
+        print(f"  bcrypt rounds={rounds:2d}: {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = rounds
+    return {"PASSWORD_HASH_SCHEME": "bcrypt", "BCRYPT_ROUNDS": best}
+
+
+def calibrate_argon2(target_ms: float, samples: int, memory_cost: int, parallelism: int) -> dict:
+    best = 1
+    for time_cost in range(1, 64):
+        context = build_password_context(
+            scheme="argon2",
+            argon2_time_cost=time_cost,
+            argon2_memory_cost=memory_cost,
+            argon2_parallelism=parallelism,
+        )
+        elapsed = measure_ms(context, samples)
+        print(f"  argon2 time_cost={time_cost:2d} memory={memory_cost} KiB parallelism={parallelism}: {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = time_cost
+    return {
+        "PASSWORD_HASH_SCHEME": "argon2",
+        "ARGON2_TIME_COST": best,
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_PARALLELISM": parallelism,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default=settings.PASSWORD_HASH_SCHEME)
+    parser.add_argument("--target-ms", type=float, default=settings.PASSWORD_HASH_TARGET_MS)
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--memory-cost", type=int, default=settings.ARGON2_MEMORY_COST, help="argon2 memory in KiB")
+    parser.add_argument("--parallelism", type=int, default=settings.ARGON2_PARALLELISM)
+    args = parser.parse_args()
+
+    print(f"Calibrating {args.scheme} for a {args.target_ms:.0f} ms budget per hash...")
+    if args.scheme == "argon2":
+        result = calibrate_argon2(args.target_ms, args.samples, args.memory_cost, args.parallelism)
+    else:
+        result = calibrate_bcrypt(args.target_ms, args.samples)
+
+    print("\n✓ Add these settings to .env:")
+    for key, value in result.items():
+        print(f"{key}={value}")
+    workers = settings.PASSWORD_HASH_WORKERS
+    print(f"\nWith PASSWORD_HASH_WORKERS={workers}, each worker process can serve "
+          f"about {workers * 1000 / args.target_ms:.0f} logins/s at this cost.")
+
+
+if __name__ == "__main__":
+    main()
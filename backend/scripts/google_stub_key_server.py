@@ -0,0 +1,117 @@
+"""
+Offline check of Google ID-token verification against a stub key server.
+
+Serves a JWKS with a Cache-Control max-age on localhost, points
+GOOGLE_CERTS_URL at it, mints ID tokens signed with the stub key and runs
+them through verify_google_token. Checks that a valid token is accepted,
+that tampered, wrong-audience and unknown-key tokens are rejected, and that
+repeated verifications do not refetch the keys.
+
+    python scripts/google_stub_key_server.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STUB_HOST = "127.0.0.1"
+STUB_PORT = 8766
+CLIENT_ID = "stub-client-id.apps.googleusercontent.com"
+
+os.environ.setdefault("SECRET_KEY", "stub-secret")
+os.environ.setdefault("JWT_SECRET_KEY", "stub-jwt-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./stub.db")
+os.environ["GOOGLE_CLIENT_ID"] = CLIENT_ID
+os.environ["GOOGLE_CERTS_URL"] = f"http://{STUB_HOST}:{STUB_PORT}/oauth2/v3/certs"
+
+import uvicorn
+from cryptography.hazmat.primitives import serialization
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from jose import jwk, jwt
+
+from app.core.google_oauth import verify_google_token
+from app.core.http_client import close_http_client
+from app.core.jwt_keys import generate_private_key_pem
+
+KID = "stub-key-1"
+PRIVATE_PEM = generate_private_key_pem("RS256")
+PUBLIC_PEM = serialization.load_pem_private_key(PRIVATE_PEM, password=None).public_key().public_bytes(
+    encoding=serialization.Encoding.PEM,
+    format=serialization.PublicFormat.SubjectPublicKeyInfo,
+)
+
+cert_requests = 0
+stub = FastAPI()
+
+
+@stub.get("/oauth2/v3/certs")
+async def certs():
+    global cert_requests
+    cert_requests += 1
+    key = jwk.construct(PUBLIC_PEM, "RS256").to_dict()
+    key.update({"kid": KID, "use": "sig", "alg": "RS256"})
+    return JSONResponse(
+        content={"keys": [key]},
+        headers={"Cache-Control": "public, max-age=19800, must-revalidate, no-transform"},
+    )
+
+
+def mint(audience: str = CLIENT_ID, kid: str = KID) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": audience,
+        "sub": "1234567890",
+        "email": "stub.user@example.com",
+        "email_verified": True,
+        "name": "Stub User",
+        "picture": "https://example.com/stub.png",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, PRIVATE_PEM, algorithm="RS256", headers={"kid": kid})
+
+
+async def main():
+    server = uvicorn.Server(uvicorn.Config(stub, host=STUB_HOST, port=STUB_PORT, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    failures = 0
+
+    def check(label: str, ok: bool):
+        nonlocal failures
+        print(f"{'✓' if ok else '✗'} {label}")
+        failures += 0 if ok else 1
+
+    try:
+        user_info = await verify_google_token(mint())
+        check("valid token accepted", bool(user_info) and user_info["email"] == "stub.user@example.com")
+
+        valid = mint()
+        check("tampered token rejected", await verify_google_token(valid[:-4] + "AAAA") is None)
+        check("wrong audience rejected", await verify_google_token(mint(audience="someone-else")) is None)
+
+        requests_before = cert_requests
+        started = time.perf_counter()
+        for _ in range(200):
+            await verify_google_token(valid)
+        elapsed = (time.perf_counter() - started) / 200
+        check(f"cached keys reused ({elapsed * 1e6:.0f} µs/verify, 0 fetches)", cert_requests == requests_before)
+
+        check("unknown key rejected", await verify_google_token(mint(kid="rotated-away")) is None)
+    finally:
+        await close_http_client()
+        server.should_exit = True
+        await server_task
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,9 @@
 """
 Script to initialize the database and create tables.
 Run this before starting the application for the first time.
+
+The database is stamped with the current Alembic head, so the schema
+version check at startup passes and later migrations apply on top.
 """
 import asyncio
 import sys
@@ -9,25 +12,40 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.database import init_db
+from alembic import command
 
+from app.core.database import init_db, close_db
+from app.core.schema import alembic_config
 
-async def main():
-    print("Initializing database...")
+
+async def create_tables():
     try:
         await init_db()
+    finally:
+        await close_db()
+
+
+def main():
+    print("Initializing database...")
+    try:
+        asyncio.run(create_tables())
+        # env.py runs its own event loop, so stamp outside ours
+        command.stamp(alembic_config(), "head")
         print("✓ Database initialized successfully!")
         print("\nTables created:")
         print("  - users")
+        print("  - auth_tokens")
+        print("  - oauth_identities")
         print("  - organizations")
         print("  - organization_members")
         print("  - subscriptions")
         print("  - invoices")
         print("  - payment_methods")
+        print("  - activity_logs")
     except Exception as e:
         print(f"✗ Error initializing database: {e}")
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
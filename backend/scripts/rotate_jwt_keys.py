@@ -0,0 +1,57 @@
+"""
+Create and prune asymmetric JWT signing keys.
+
+Creates a new key once the newest key is older than JWT_KEY_ROTATION_DAYS
+minus the publish-ahead window, so the new key is already in the JWKS when
+it starts signing. Removes keys that have not signed anything for longer
+than the refresh token lifetime. Safe to run as often as you like (e.g.
+daily from cron) on the host that owns JWT_KEYS_DIR.
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.jwt_keys import KID_FORMAT, generate_private_key_pem, is_asymmetric, is_kid, kid_created_at
+
+
+def main():
+    if not is_asymmetric(settings.JWT_ALGORITHM):
+        print(f"✗ JWT_ALGORITHM is {settings.JWT_ALGORITHM}; key rotation only applies to RS*/ES* algorithms.")
+        sys.exit(1)
+
+    keys_dir = Path(settings.JWT_KEYS_DIR)
+    keys_dir.mkdir(parents=True, exist_ok=True)
+
+    now = datetime.utcnow()
+    rotation = timedelta(days=settings.JWT_KEY_ROTATION_DAYS)
+    publish_ahead = timedelta(hours=settings.JWT_KEY_PUBLISH_AHEAD_HOURS)
+    max_token_lifetime = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+    kids = sorted(path.stem for path in keys_dir.glob("*.pem") if is_kid(path.stem))
+
+    if not kids or kid_created_at(kids[-1]) <= now - rotation + publish_ahead:
+        kid = now.strftime(KID_FORMAT)
+        path = keys_dir / f"{kid}.pem"
+        path.write_bytes(generate_private_key_pem(settings.JWT_ALGORITHM))
+        path.chmod(0o600)
+        kids.append(kid)
+        print(f"✓ Created signing key {kid}")
+    else:
+        print(f"Newest signing key {kids[-1]} is still current")
+
+    # A key stops signing once its successor is active; keep it for verification
+    # until every token it signed has expired.
+    for kid, successor in zip(kids, kids[1:]):
+        retired_at = kid_created_at(successor) + publish_ahead
+        if retired_at + max_token_lifetime < now:
+            (keys_dir / f"{kid}.pem").unlink()
+            print(f"✓ Removed expired signing key {kid}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read at import time
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret")
+# Always a scratch database: tests drop and recreate every table
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.gettempdir()}/saaskit-test.db"
+os.environ.setdefault("TOKEN_STORE_BACKEND", "memory")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "memory")
+# Cheap hashes; the cost itself is not under test
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def run_db():
+    """
+    Return a runner for coroutines that use the database: each gets an
+    empty schema and clean in-process caches, and the engine is disposed in
+    the same event loop.
+    """
+    from app.core.database import Base, engine, read_your_writes_pins
+    from app.core.principal import principal_cache
+    from app.core.security import token_cache
+    import app.models  # noqa: F401
+
+    async def with_schema(coroutine):
+        for cache in (principal_cache, token_cache, read_your_writes_pins):
+            cache.clear()
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            return await coroutine
+        finally:
+            await engine.dispose()
+
+    return lambda coroutine: asyncio.run(with_schema(coroutine))
@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.main import app
+from app.models.activity_log import ActivityLog
+from app.models.organization import Organization, OrganizationMember
+from app.models.user import User
+from app.services.activity_log import (
+    ActivityLogBuffer,
+    activity_query,
+    is_partition,
+    maintain_log_storage,
+    query_window,
+)
+
+
+def buffer(max_size: int = 100, batch_size: int = 100) -> ActivityLogBuffer:
+    return ActivityLogBuffer(
+        flush_interval=60, max_pending=1000, max_size=max_size, batch_size=batch_size, maintenance_interval=3600
+    )
+
+
+async def stored_rows():
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(ActivityLog.action_type, ActivityLog.details.is_(None)).order_by(ActivityLog.created_at)
+        )
+        return result.all()
+
+
+def test_partition_names():
+    assert is_partition("activity_logs_default")
+    assert is_partition("activity_logs_2026_10")
+    assert not is_partition("activity_logs")
+    assert not is_partition("activity_logs_2026_1")
+    assert not is_partition("users_2026_10")
+
+
+def test_query_window_defaults_and_limits():
+    until = datetime(2026, 10, 18, 12, tzinfo=timezone(timedelta(hours=2)))
+    since, resolved_until = query_window(None, until)
+
+    # Naive UTC, last 30 days by default
+    assert resolved_until == datetime(2026, 10, 18, 10)
+    assert since == resolved_until - timedelta(days=30)
+    with pytest.raises(ValueError):
+        query_window(until, until)
+    with pytest.raises(ValueError):
+        query_window(until - timedelta(days=settings.ACTIVITY_LOG_MAX_QUERY_DAYS + 1), until)
+
+
+def test_oldest_events_are_dropped_beyond_the_cap():
+    events = buffer(max_size=2)
+    for action in ("a", "b", "c"):
+        events.log_activity(action)
+
+    assert [row["action_type"] for row in events._pending[ActivityLog]] == ["b", "c"]
+    assert events.dropped == 1
+
+
+def test_flush_writes_queued_events_in_batches(run_db):
+    async def scenario():
+        events = buffer(batch_size=2)
+        events.log_activity("user.login")
+        events.log_activity("user.logout", details={"reason": "expired"})
+        events.log_activity("team.invite")
+        written = await events.flush()
+        return written, events.stats(), await stored_rows()
+
+    written, stats, rows = run_db(scenario())
+    assert written == 3
+    assert stats["pending"] == 0 and stats["rows_flushed"] == 3
+    # details=None is stored as SQL NULL, not JSON null
+    assert sorted(rows) == [("team.invite", True), ("user.login", True), ("user.logout", False)]
+
+
+def test_failed_flush_requeues_unwritten_events_first(monkeypatch):
+    events = buffer(max_size=3, batch_size=1)
+    for action in ("a", "b", "c"):
+        events.log_activity(action)
+    inserted = []
+
+    async def insert(model, rows):
+        await asyncio.sleep(0)
+        if inserted:
+            raise ConnectionError("database down")
+        inserted.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(events, "_insert", insert)
+
+    async def scenario():
+        flushing = asyncio.create_task(events.flush())
+        await asyncio.sleep(0)
+        events.log_activity("d")
+        with pytest.raises(ConnectionError):
+            await flushing
+
+    asyncio.run(scenario())
+
+    # "a" was written; "b" and "c" go back ahead of "d"
+    assert [row["action_type"] for row in inserted] == ["a"]
+    assert [row["action_type"] for row in events._pending[ActivityLog]] == ["b", "c", "d"]
+    assert events.errors == 1 and events.dropped == 0
+
+
+def test_sqlite_retention_deletes_old_rows(run_db, monkeypatch):
+    monkeypatch.setattr(settings, "ACTIVITY_LOG_RETENTION_MONTHS", 1)
+
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            for at in (datetime(2026, 8, 31), datetime(2026, 9, 1), datetime(2026, 10, 2)):
+                session.add(ActivityLog(action_type="old" if at.month == 8 else "kept", created_at=at))
+            await session.commit()
+        result = await maintain_log_storage(now=datetime(2026, 10, 18))
+        return result, await stored_rows()
+
+    result, rows = run_db(scenario())
+    assert result == {"created": 0, "dropped": 1}
+    assert [action for action, _ in rows] == ["kept", "kept"]
+
+
+def test_activity_query_is_bounded_by_the_window(run_db):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            for day in (1, 10, 20):
+                session.add(ActivityLog(action_type=f"day-{day}", created_at=datetime(2026, 10, day)))
+            await session.commit()
+            result = await session.execute(activity_query(datetime(2026, 10, 5), datetime(2026, 10, 20)))
+            return [row.action_type for row in result.scalars()]
+
+    assert run_db(scenario()) == ["day-10"]
+
+
+def test_activity_endpoint_validates_ids_and_membership(run_db):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as api:
+            registered = await api.post(
+                "/auth/register",
+                json={"email": "member@example.com", "password": "password123", "full_name": "Member"},
+            )
+            headers = {"Authorization": f"Bearer {registered.json()['access_token']}"}
+
+            async with AsyncSessionLocal() as session:
+                user_id = await session.scalar(select(User.id))
+                mine = Organization(name="Mine", owner_id=user_id)
+                other = Organization(name="Other", owner_id=user_id)
+                session.add_all([mine, other])
+                await session.flush()
+                session.add(OrganizationMember(organization_id=mine.id, user_id=user_id))
+                session.add(ActivityLog(organization_id=mine.id, user_id=user_id, action_type="team.invite"))
+                await session.commit()
+
+            return [
+                await api.get("/organizations/not-a-uuid/activity", headers=headers),
+                await api.get(f"/organizations/{mine.id}/activity?user_id=nope", headers=headers),
+                await api.get(f"/organizations/{other.id}/activity", headers=headers),
+                await api.get(f"/organizations/{mine.id}/activity?user_id={user_id}", headers=headers),
+            ]
+
+    bad_org, bad_user, not_member, listed = run_db(scenario())
+    assert bad_org.status_code == 422
+    assert bad_user.status_code == 422
+    assert not_member.status_code == 404
+    assert listed.status_code == 200
+    assert [row["action_type"] for row in listed.json()] == ["team.invite"]
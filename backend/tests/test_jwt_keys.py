@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+from jose import jwt
+
+from app.core import security
+from app.core.config import settings
+from app.core.jwt_keys import KID_FORMAT, KeyRing, generate_private_key_pem
+
+ALGORITHM = "ES256"
+
+
+def write_key(keys_dir, created_at: datetime) -> str:
+    kid = created_at.strftime(KID_FORMAT)
+    (keys_dir / f"{kid}.pem").write_bytes(generate_private_key_pem(ALGORITHM))
+    return kid
+
+
+@pytest.fixture
+def keys_dir(tmp_path):
+    return tmp_path
+
+
+@pytest.fixture
+def ring(keys_dir):
+    return KeyRing(str(keys_dir), ALGORITHM, publish_ahead=timedelta(hours=24))
+
+
+@pytest.fixture
+def asymmetric(monkeypatch, ring, keys_dir):
+    write_key(keys_dir, datetime.utcnow() - timedelta(days=2))
+    monkeypatch.setattr(settings, "JWT_ALGORITHM", ALGORITHM)
+    monkeypatch.setattr(security, "key_ring", ring)
+    return ring
+
+
+def test_new_key_is_published_before_it_signs(ring, keys_dir):
+    now = datetime.utcnow()
+    current = write_key(keys_dir, now - timedelta(days=2))
+    upcoming = write_key(keys_dir, now - timedelta(hours=1))
+
+    assert ring.signing_key().kid == current
+    assert [key["kid"] for key in ring.jwks()["keys"]] == [current, upcoming]
+    assert all(key["alg"] == ALGORITHM and key["use"] == "sig" for key in ring.jwks()["keys"])
+
+
+def test_published_key_takes_over_signing(ring, keys_dir):
+    now = datetime.utcnow()
+    write_key(keys_dir, now - timedelta(days=30))
+    newer = write_key(keys_dir, now - timedelta(days=1, hours=1))
+
+    assert ring.signing_key().kid == newer
+
+
+def test_stray_files_are_skipped(ring, keys_dir):
+    kid = write_key(keys_dir, datetime.utcnow() - timedelta(days=2))
+    (keys_dir / "backup.pem").write_bytes(generate_private_key_pem(ALGORITHM))
+    (keys_dir / "20200101000000.pem").write_bytes(b"not a key")
+
+    assert [key.kid for key in ring.keys()] == [kid]
+
+
+def test_missing_keys_fail_loudly(ring):
+    with pytest.raises(RuntimeError):
+        ring.signing_key()
+
+
+def test_verification_key_rejects_unknown_and_non_string_kids(ring, keys_dir):
+    kid = write_key(keys_dir, datetime.utcnow() - timedelta(days=2))
+
+    assert ring.verification_key(kid).kid == kid
+    assert ring.verification_key("20000101000000") is None
+    assert ring.verification_key(None) is None
+    assert ring.verification_key([kid]) is None
+    assert ring.verification_key({"kid": kid}) is None
+
+
+def test_signed_token_round_trips(asymmetric):
+    token = security.create_access_token({"sub": "user@example.com"})
+
+    assert jwt.get_unverified_header(token)["kid"] == asymmetric.signing_key().kid
+    assert security.decode_token(token)["sub"] == "user@example.com"
+
+
+def test_token_with_unhashable_kid_is_rejected(asymmetric):
+    key = asymmetric.signing_key()
+    token = jwt.encode(
+        {"sub": "user@example.com", "type": "access"},
+        key.private_pem,
+        algorithm=ALGORITHM,
+        headers={"kid": [key.kid]},
+    )
+
+    assert security.decode_token(token) is None
@@ -0,0 +1,90 @@
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal
+from app.models.oauth_identity import OAuthIdentity
+from app.models.user import User
+from app.services.accounts import link_oauth_account
+
+
+async def link(provider: str, subject: str, email: str, picture: str = None):
+    async with AsyncSessionLocal() as session:
+        account = await link_oauth_account(session, provider, subject, email, "OAuth User", picture)
+        await session.commit()
+        return account
+
+
+async def users():
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(select(User).order_by(User.email))).scalars().all()
+
+
+async def identities():
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(OAuthIdentity.provider, OAuthIdentity.subject, OAuthIdentity.user_id))
+        return sorted(result.all())
+
+
+def test_first_login_creates_a_verified_user(run_db):
+    async def scenario():
+        account = await link("google", "g-1", "new@example.com", "https://pics/1")
+        return account, await users(), await identities()
+
+    account, [user], [identity] = run_db(scenario())
+    assert account.id == user.id
+    assert account.email == "new@example.com"
+    assert user.hashed_password is None
+    assert user.is_verified and user.oauth_provider == "google"
+    assert user.profile_picture == "https://pics/1"
+    assert identity == ("google", "g-1", user.id)
+
+
+def test_repeat_login_finds_the_linked_user(run_db):
+    async def scenario():
+        first = await link("github", "42", "dev@example.com")
+        before = (await users())[0].last_login
+        # The provider's email changed; the (provider, subject) link wins
+        again = await link("github", "42", "renamed@example.com")
+        return first, again, before, await users(), await identities()
+
+    first, again, before, [user], links = run_db(scenario())
+    assert again.id == first.id
+    assert again.email == "dev@example.com"
+    assert user.last_login >= before
+    assert len(links) == 1
+
+
+def test_existing_email_is_linked_instead_of_duplicated(run_db):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            session.add(User(
+                email="member@example.com",
+                full_name="Member",
+                hashed_password="hash",
+                profile_picture="uploads/me.png",
+                is_verified=False,
+            ))
+            await session.commit()
+        account = await link("google", "g-2", "member@example.com", "https://pics/2")
+        return account, await users(), await identities()
+
+    account, [user], [identity] = run_db(scenario())
+    assert account.id == user.id
+    assert user.hashed_password == "hash"
+    assert user.is_verified
+    # An existing picture is kept
+    assert user.profile_picture == "uploads/me.png"
+    assert identity == ("google", "g-2", user.id)
+
+
+def test_two_providers_link_to_one_user(run_db):
+    async def scenario():
+        google = await link("google", "g-3", "both@example.com")
+        github = await link("github", "7", "both@example.com")
+        async with AsyncSessionLocal() as session:
+            count = await session.scalar(select(func.count()).select_from(User))
+        return google, github, count, await identities()
+
+    google, github, count, links = run_db(scenario())
+    assert google.id == github.id
+    assert count == 1
+    assert [(provider, subject) for provider, subject, _ in links] == [("github", "7"), ("google", "g-3")]
@@ -0,0 +1,94 @@
+import base64
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor, paginate
+from app.main import app
+from app.models.organization import Organization, OrganizationMember
+from app.models.types import new_id
+from app.models.user import User
+
+TIED = datetime(2026, 10, 1, 12)
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).rstrip(b"=").decode()
+
+
+def test_cursor_round_trip():
+    id = new_id()
+    cursor = encode_cursor(TIED, id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (TIED, id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "garbage!",
+    raw_cursor({"created_at": "2026-10-01"}),
+    raw_cursor(["not a date", new_id()]),
+    raw_cursor(["2026-10-01T12:00:00", "not-a-uuid"]),
+    raw_cursor(["2026-10-01T12:00:00"]),
+])
+def test_tampered_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_pages_cover_tied_timestamps_exactly_once(run_db):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            session.add_all([User(email=f"u{i}@example.com", full_name="User", created_at=TIED) for i in range(5)])
+            session.add(User(email="newest@example.com", full_name="User", created_at=datetime(2026, 10, 2)))
+            await session.commit()
+
+            pages, cursor = [], None
+            while True:
+                page = await paginate(session, select(User), User, cursor, limit=2)
+                pages.append([user.email for user in page["items"]])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            ordered = await session.execute(select(User.email).order_by(User.created_at.desc(), User.id.desc()))
+            return pages, ordered.scalars().all()
+
+    pages, ordered = run_db(scenario())
+    assert [len(page) for page in pages] == [2, 2, 2]
+    assert [email for page in pages for email in page] == ordered
+    assert ordered[0] == "newest@example.com"
+
+
+def test_list_endpoint_pages_and_rejects_bad_cursors(run_db):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as api:
+            registered = await api.post(
+                "/auth/register",
+                json={"email": "member@example.com", "password": "password123", "full_name": "Member"},
+            )
+            headers = {"Authorization": f"Bearer {registered.json()['access_token']}"}
+            async with AsyncSessionLocal() as session:
+                user_id = await session.scalar(select(User.id))
+                for i in range(3):
+                    org = Organization(name=f"Org {i}", owner_id=user_id, created_at=TIED)
+                    session.add(org)
+                    await session.flush()
+                    session.add(OrganizationMember(organization_id=org.id, user_id=user_id))
+                await session.commit()
+
+            first = (await api.get("/organizations/?limit=2", headers=headers)).json()
+            second = (await api.get(f"/organizations/?limit=2&cursor={first['next_cursor']}", headers=headers)).json()
+            bad = await api.get("/organizations/?cursor=garbage!", headers=headers)
+            return first, second, bad
+
+    first, second, bad = run_db(scenario())
+    names = [org["name"] for org in first["items"] + second["items"]]
+    assert sorted(names) == ["Org 0", "Org 1", "Org 2"]
+    assert second["next_cursor"] is None
+    assert bad.status_code == 400
+    assert bad.json()["detail"] == "Invalid pagination cursor"
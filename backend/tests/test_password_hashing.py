@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.config import settings
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_QUEUE", 1)
+    security.shutdown_password_hasher()
+    yield
+    security.shutdown_password_hasher()
+
+
+def test_hash_and_verify_off_the_event_loop():
+    async def scenario():
+        hashed = await security.hash_password_async("correct horse")
+        return (
+            await security.verify_password_async("correct horse", hashed),
+            await security.verify_password_async("wrong horse", hashed),
+        )
+
+    assert asyncio.run(scenario()) == (True, False)
+    assert security.get_password_hash_pool_stats()["pending"] == 0
+
+
+def test_full_pool_rejects_with_503(small_pool):
+    release = threading.Event()
+
+    async def scenario():
+        # One call runs, one waits in the queue: the pool is full
+        busy = [asyncio.create_task(security._run_in_hash_pool(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as rejected:
+            await security._run_in_hash_pool(release.wait, 5)
+
+        release.set()
+        await asyncio.gather(*busy)
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "1"
+    assert security.get_password_hash_pool_stats()["pending"] == 0
+
+
+def test_pending_count_is_released_when_hashing_fails(small_pool):
+    def fail():
+        raise ValueError("bad hash")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await security._run_in_hash_pool(fail)
+
+    asyncio.run(scenario())
+    assert security.get_password_hash_pool_stats()["pending"] == 0
+
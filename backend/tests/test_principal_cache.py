@@ -0,0 +1,80 @@
+import httpx
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal
+from app.core.principal import principal_cache, prefill_principal_cache
+from app.main import app
+from app.models.user import User
+
+EMAIL = "user@example.com"
+
+
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test/api/v1")
+
+
+async def register(api: httpx.AsyncClient, email: str = EMAIL) -> dict:
+    response = await api.post("/auth/register", json={"email": email, "password": "password123", "full_name": "User"})
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_principal_is_cached_after_the_first_request(run_db):
+    async def scenario():
+        async with client() as api:
+            headers = await register(api)
+            first = await api.get("/users/me", headers=headers)
+            hits = principal_cache.hits
+            second = await api.get("/users/me", headers=headers)
+            return first.json(), second.json(), principal_cache.hits - hits
+
+    first, second, hits = run_db(scenario())
+    assert first == second
+    assert first["email"] == EMAIL
+    assert hits == 1
+
+
+def test_profile_update_invalidates_the_cached_principal(run_db):
+    async def scenario():
+        async with client() as api:
+            headers = await register(api)
+            await api.get("/users/me", headers=headers)
+            updated = await api.put("/users/me", json={"full_name": "Renamed"}, headers=headers)
+            assert updated.status_code == 200
+            return (await api.get("/users/me", headers=headers)).json()
+
+    assert run_db(scenario())["full_name"] == "Renamed"
+
+
+def test_deleted_user_is_dropped_from_the_cache(run_db):
+    async def scenario():
+        async with client() as api:
+            headers = await register(api)
+            await api.get("/users/me", headers=headers)
+            async with AsyncSessionLocal() as session:
+                await session.execute(delete(User).where(User.email == EMAIL))
+                await session.commit()
+
+            # Handlers that load the full row notice and evict the principal
+            write = await api.put("/users/me", json={"full_name": "Ghost"}, headers=headers)
+            read = await api.get("/users/me", headers=headers)
+            return write.status_code, read.status_code, principal_cache.get(EMAIL)
+
+    assert run_db(scenario()) == (401, 401, None)
+
+
+def test_prefill_loads_recently_seen_users(run_db):
+    async def scenario():
+        async with client() as api:
+            await register(api, "seen@example.com")
+            await register(api, "unseen@example.com")
+        async with AsyncSessionLocal() as session:
+            user = (await session.execute(User.__table__.select().where(User.email == "seen@example.com"))).one()
+            await session.execute(User.__table__.update().where(User.id == user.id).values(last_seen_at=user.created_at))
+            await session.commit()
+        principal_cache.clear()
+        return await prefill_principal_cache(10)
+
+    assert run_db(scenario()) == 1
+    assert principal_cache.get("seen@example.com").email == "seen@example.com"
+    assert principal_cache.get("unseen@example.com") is None
@@ -0,0 +1,117 @@
+import asyncio
+
+from starlette.requests import Request
+
+from app.core.client_ip import client_ip, parse_networks
+from app.core.config import settings
+from app.core.rate_limit import InMemoryLoginBackend, LocalTokenBuckets, LoginLimiter, lockout_seconds
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class FailingBackend:
+    async def admit(self, account: str, ip: str) -> float:
+        raise ConnectionError("backend down")
+
+    async def record_failure(self, account: str) -> int:
+        raise ConnectionError("backend down")
+
+    async def record_success(self, account: str) -> None:
+        raise ConnectionError("backend down")
+
+
+def request(peer: str, *forwarded: str) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded]
+    return Request({"type": "http", "client": (peer, 12345), "headers": headers})
+
+
+def test_bucket_admits_up_to_capacity_then_asks_to_wait():
+    buckets = LocalTokenBuckets(capacity=3, refill_per_second=0.5)
+
+    assert [buckets.take("key") for _ in range(3)] == [0, 0, 0]
+    retry_after = buckets.take("key")
+    assert 0 < retry_after <= 2
+    # Other keys have their own bucket
+    assert buckets.take("other") == 0
+
+
+def test_buckets_keep_only_the_most_recent_keys():
+    buckets = LocalTokenBuckets(capacity=1, refill_per_second=0.001, max_keys=2)
+    buckets.take("a")
+    buckets.take("b")
+    buckets.take("c")
+
+    assert len(buckets) == 2
+    # "a" was evicted, so it starts with a full bucket again
+    assert buckets.take("a") == 0
+    assert buckets.take("c") > 0
+
+
+def test_lockout_grows_exponentially_up_to_the_maximum():
+    threshold = settings.LOGIN_LOCKOUT_THRESHOLD
+    base = settings.LOGIN_LOCKOUT_BASE_SECONDS
+
+    assert lockout_seconds(threshold - 1) == 0
+    assert lockout_seconds(threshold) == base
+    assert lockout_seconds(threshold + 1) == base * 2
+    assert lockout_seconds(threshold + 100) == settings.LOGIN_LOCKOUT_MAX_SECONDS
+
+
+def test_repeated_failures_lock_the_account_out():
+    limiter = LoginLimiter(InMemoryLoginBackend())
+    for _ in range(settings.LOGIN_LOCKOUT_THRESHOLD):
+        assert run(limiter.admit("user@example.com", "203.0.113.1")) is None
+        run(limiter.record_failure("user@example.com"))
+
+    assert run(limiter.admit("User@Example.com ", "203.0.113.2")) >= 1
+    assert run(limiter.admit("other@example.com", "203.0.113.1")) is None
+    assert limiter.counters["rejected_lockout"] == 1
+
+
+def test_success_resets_the_failure_streak():
+    limiter = LoginLimiter(InMemoryLoginBackend())
+    for _ in range(settings.LOGIN_LOCKOUT_THRESHOLD - 1):
+        run(limiter.record_failure("user@example.com"))
+    run(limiter.record_success("user@example.com"))
+    run(limiter.record_failure("user@example.com"))
+
+    assert run(limiter.admit("user@example.com", "203.0.113.1")) is None
+
+
+def test_ip_bucket_is_shared_across_accounts():
+    limiter = LoginLimiter(InMemoryLoginBackend())
+    results = [
+        run(limiter.admit(f"user{i}@example.com", "203.0.113.1"))
+        for i in range(settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE + 1)
+    ]
+
+    assert results[:-1] == [None] * settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE
+    assert results[-1] >= 1
+    assert limiter.counters["rejected_ip"] == 1
+
+
+def test_lockouts_still_apply_while_the_backend_is_down():
+    limiter = LoginLimiter(FailingBackend())
+    for _ in range(settings.LOGIN_LOCKOUT_THRESHOLD):
+        assert run(limiter.admit("user@example.com", "203.0.113.1")) is None
+        run(limiter.record_failure("user@example.com"))
+
+    assert run(limiter.admit("user@example.com", "203.0.113.1")) >= 1
+    assert limiter.stats()["backend_available"] is False
+
+
+def test_client_ip_ignores_forwarded_header_from_untrusted_peers():
+    networks = parse_networks("10.0.0.0/8")
+
+    assert client_ip(request("198.51.100.7", "203.0.113.1"), networks) == "198.51.100.7"
+
+
+def test_client_ip_skips_trusted_proxies_from_the_right():
+    networks = parse_networks("10.0.0.0/8, 192.0.2.10")
+
+    # The leftmost entry was supplied by the client and is not believed
+    assert client_ip(request("10.0.0.2", "6.6.6.6, 203.0.113.1, 192.0.2.10"), networks) == "203.0.113.1"
+    assert client_ip(request("10.0.0.2", "6.6.6.6", "203.0.113.1"), networks) == "203.0.113.1"
+    assert client_ip(request("10.0.0.2"), networks) == "10.0.0.2"
@@ -0,0 +1,107 @@
+import httpx
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.database import (
+    AsyncSessionLocal,
+    ReplicaRouter,
+    client_pin_key,
+    pin_user,
+    read_your_writes_pins,
+    user_pin_key,
+)
+from app.core.security import create_access_token
+from app.main import app
+from app.models.user import User
+
+
+@pytest.fixture
+def router():
+    return ReplicaRouter([create_async_engine(settings.DATABASE_URL)])
+
+
+def request(authorization: str = None) -> Request:
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({"type": "http", "client": ("203.0.113.9", 12345), "headers": headers})
+
+
+async def write(pin_keys, statement=None, commit=True):
+    async with AsyncSessionLocal() as session:
+        session.info["pin_keys"] = set(pin_keys)
+        if statement is None:
+            session.add(User(email="writer@example.com", full_name="Writer"))
+        else:
+            await session.execute(statement)
+        if commit:
+            await session.commit()
+        else:
+            await session.rollback()
+
+
+def test_clients_are_keyed_by_token_subject_or_ip():
+    token = create_access_token({"sub": "user@example.com"})
+
+    assert client_pin_key(request(f"Bearer {token}")) == user_pin_key("user@example.com")
+    assert client_pin_key(request("Bearer not-a-token")) == "ip:203.0.113.9"
+    assert client_pin_key(request()) == "ip:203.0.113.9"
+
+
+def test_reads_go_to_replicas_until_the_client_writes(router):
+    read_your_writes_pins.clear()
+    replica = router.replicas[0]["sessionmaker"]
+
+    assert router.sessionmaker_for("user:a@example.com") is replica
+    read_your_writes_pins.set("user:a@example.com", True)
+    assert router.sessionmaker_for("user:a@example.com") is AsyncSessionLocal
+    assert router.sessionmaker_for("user:b@example.com") is replica
+    assert router.stats()["pinned_reads"] == 1
+
+
+def test_unhealthy_replicas_fall_back_to_the_primary(router):
+    router.replicas[0]["healthy"] = False
+
+    assert router.sessionmaker_for(None) is AsyncSessionLocal
+
+
+def test_committed_writes_pin_every_key_of_the_session(run_db):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            session.info["pin_keys"] = {"ip:203.0.113.9"}
+            session.add(User(email="new@example.com", full_name="New"))
+            pin_user(session, "new@example.com")
+            await session.commit()
+
+    run_db(scenario())
+    assert read_your_writes_pins.get("ip:203.0.113.9")
+    assert read_your_writes_pins.get(user_pin_key("new@example.com"))
+
+
+def test_reads_and_rolled_back_writes_do_not_pin(run_db):
+    async def scenario():
+        await write({"user:reader@example.com"}, select(User.id))
+        await write({"user:rollback@example.com"}, commit=False)
+        await write({"user:core@example.com"}, update(User.__table__).values(bio="x"))
+
+    run_db(scenario())
+    assert read_your_writes_pins.get("user:reader@example.com") is None
+    assert read_your_writes_pins.get("user:rollback@example.com") is None
+    # Core statements count as writes too
+    assert read_your_writes_pins.get("user:core@example.com")
+
+
+def test_registration_pins_the_new_user(run_db):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1") as api:
+            response = await api.post(
+                "/auth/register",
+                json={"email": "signup@example.com", "password": "password123", "full_name": "Signup"},
+            )
+            return response.json()["access_token"]
+
+    token = run_db(scenario())
+    # The follow-up request carries the new token and is served by the primary
+    assert read_your_writes_pins.get(client_pin_key(request(f"Bearer {token}")))
@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+from app.core.revocation import BloomFilter, InMemoryRevocationBackend, RevocationList
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def token(jti: str, ttl: float = 600) -> dict:
+    return {"jti": jti, "exp": time.time() + ttl}
+
+
+def revocation_list(backend=None) -> RevocationList:
+    return RevocationList(backend or InMemoryRevocationBackend(), capacity=1000, error_rate=0.001, bucket_seconds=900)
+
+
+class FailingBackend(InMemoryRevocationBackend):
+    async def contains(self, jti: str) -> bool:
+        raise ConnectionError("backend down")
+
+
+class PublishDuringLoadBackend(InMemoryRevocationBackend):
+    """Another worker revokes a token while this one is scanning the backend."""
+
+    def __init__(self, published: dict):
+        super().__init__()
+        self.published = published
+
+    async def entries(self):
+        snapshot = [entry async for entry in super().entries()]
+        await self.add(self.published["jti"], self.published["exp"])
+        for entry in snapshot:
+            yield entry
+
+
+async def wait_until_loaded(revocations: RevocationList) -> None:
+    async def loaded():
+        while not revocations.loaded:
+            await asyncio.sleep(0)
+    await asyncio.wait_for(loaded(), timeout=1)
+
+
+def test_bloom_filter_contains_added_items():
+    bloom = BloomFilter(capacity=1000, error_rate=0.001)
+    for i in range(1000):
+        bloom.add(f"revoked-{i}")
+
+    assert all(f"revoked-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"valid-{i}" in bloom for i in range(10000))
+    assert false_positives < 50
+
+
+def test_unloaded_list_asks_the_backend():
+    backend = InMemoryRevocationBackend()
+    revocations = revocation_list(backend)
+    revoked = token("revoked")
+    # Revoked by another worker; this worker's filters are still empty
+    run(backend.add(revoked["jti"], revoked["exp"]))
+
+    assert run(revocations.is_revoked(revoked)) is True
+    assert run(revocations.is_revoked(token("valid"))) is False
+    assert revocations.unloaded_lookups == 2
+    assert revocations.filter_negatives == 0
+
+
+def test_unloaded_list_accepts_tokens_when_the_backend_is_down():
+    revocations = revocation_list(FailingBackend())
+
+    assert run(revocations.is_revoked(token("any"))) is False
+    assert revocations.backend_errors == 1
+
+
+def test_loaded_list_answers_misses_from_the_filter():
+    backend = InMemoryRevocationBackend()
+    revocations = revocation_list(backend)
+    revoked = token("revoked")
+    run(backend.add(revoked["jti"], revoked["exp"]))
+
+    assert run(revocations.load()) == 1
+    revocations.loaded = True
+
+    assert run(revocations.is_revoked(revoked)) is True
+    assert run(revocations.is_revoked(token("valid"))) is False
+    assert revocations.filter_positives == 1
+    assert revocations.filter_negatives == 1
+
+
+def test_revoke_is_seen_locally():
+    revocations = revocation_list()
+    revocations.loaded = True
+    revoked = token("revoked")
+
+    run(revocations.revoke(revoked))
+
+    assert run(revocations.is_revoked(revoked)) is True
+    assert revocations.revocations == 1
+
+
+def test_expired_and_malformed_tokens_are_not_recorded():
+    revocations = revocation_list()
+    revocations.loaded = True
+
+    run(revocations.revoke(token("expired", ttl=-1)))
+    run(revocations.revoke({"jti": "no-exp"}))
+
+    assert revocations.revocations == 0
+    assert run(revocations.is_revoked({"jti": "no-exp"})) is False
+
+
+def test_revocation_published_during_load_reaches_the_filter():
+    published = token("revoked-during-load")
+
+    async def scenario():
+        revocations = revocation_list(PublishDuringLoadBackend(published))
+        listener = asyncio.create_task(revocations.listen())
+        try:
+            await wait_until_loaded(revocations)
+            return await revocations.is_revoked(published)
+        finally:
+            listener.cancel()
+
+    assert run(scenario()) is True
+
+
+def test_listener_applies_revocations_from_other_workers():
+    async def scenario():
+        backend = InMemoryRevocationBackend()
+        revocations = revocation_list(backend)
+        listener = asyncio.create_task(revocations.listen())
+        try:
+            await wait_until_loaded(revocations)
+            revoked = token("revoked-elsewhere")
+            await backend.add(revoked["jti"], revoked["exp"])
+            await asyncio.sleep(0)
+            return revocations._might_be_revoked(revoked["jti"], revoked["exp"])
+        finally:
+            listener.cancel()
+
+    assert run(scenario()) is True
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.security import create_access_token, create_refresh_token, decode_token, evict_token, token_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    token_cache.clear()
+
+
+def test_entries_expire_at_their_own_time():
+    cache = TTLCache(max_size=10, default_ttl=60)
+    cache.set("short", 1, expires_at=time.time() - 1)
+    cache.set("long", 2)
+
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    assert cache.expirations == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2, default_ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = TTLCache(max_size=0, default_ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+
+
+def test_access_token_is_cached_until_it_expires():
+    token = create_access_token({"sub": "user@example.com"})
+    payload = decode_token(token)
+    hits = token_cache.hits
+
+    assert decode_token(token) == payload
+    assert token_cache.hits == hits + 1
+    assert len(token_cache) == 1
+    expires_at, _ = next(iter(token_cache._entries.values()))
+    assert expires_at == payload["exp"]
+
+
+def test_cached_token_is_not_served_after_expiry(monkeypatch):
+    token = create_access_token({"sub": "user@example.com"})
+    exp = decode_token(token)["exp"]
+    hits, expirations = token_cache.hits, token_cache.expirations
+
+    # Past exp the entry is gone and the token goes through full verification
+    monkeypatch.setattr(time, "time", lambda: exp + 1)
+    decode_token(token)
+    assert token_cache.hits == hits
+    assert token_cache.expirations == expirations + 1
+
+
+def test_callers_get_a_copy_of_the_cached_payload():
+    token = create_access_token({"sub": "user@example.com"})
+    decode_token(token)["sub"] = "admin@example.com"
+
+    assert decode_token(token)["sub"] == "user@example.com"
+
+
+def test_refresh_and_invalid_tokens_are_not_cached():
+    assert decode_token(create_refresh_token({"sub": "user@example.com"}))["type"] == "refresh"
+    assert decode_token("not.a.token") is None
+
+    assert len(token_cache) == 0
+
+
+def test_evicted_token_is_verified_again():
+    token = create_access_token({"sub": "user@example.com"})
+    decode_token(token)
+    evict_token(token)
+
+    assert len(token_cache) == 0
+    assert decode_token(token)["sub"] == "user@example.com"
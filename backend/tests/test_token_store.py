@@ -0,0 +1,81 @@
+import asyncio
+
+from app.core.token_store import InMemoryTokenFamilyStore, RotationResult
+
+TTL = 3600
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_rotate_replaces_current_token():
+    store = InMemoryTokenFamilyStore()
+    run(store.create_family("fam", "t1", TTL, "user@example.com"))
+
+    assert run(store.rotate("fam", "t1", "t2")) == RotationResult.ROTATED
+    assert run(store.rotate("fam", "t2", "t3")) == RotationResult.ROTATED
+
+
+def test_reusing_a_rotated_token_revokes_the_family():
+    store = InMemoryTokenFamilyStore()
+    run(store.create_family("fam", "t1", TTL, "user@example.com"))
+    run(store.rotate("fam", "t1", "t2"))
+
+    assert run(store.rotate("fam", "t1", "t3")) == RotationResult.REUSED
+    # The legitimate holder's token is dead too
+    assert run(store.rotate("fam", "t2", "t3")) == RotationResult.UNKNOWN
+
+
+def test_unknown_family():
+    store = InMemoryTokenFamilyStore()
+    assert run(store.rotate("missing", "t1", "t2")) == RotationResult.UNKNOWN
+
+
+def test_family_expires():
+    clock = Clock()
+    store = InMemoryTokenFamilyStore(clock=clock)
+    run(store.create_family("fam", "t1", TTL, "user@example.com"))
+
+    clock.now += TTL
+    assert run(store.rotate("fam", "t1", "t2")) == RotationResult.UNKNOWN
+
+
+def test_rotation_does_not_extend_expiry():
+    clock = Clock()
+    store = InMemoryTokenFamilyStore(clock=clock)
+    run(store.create_family("fam", "t1", TTL, "user@example.com"))
+
+    clock.now += TTL - 10
+    assert run(store.rotate("fam", "t1", "t2")) == RotationResult.ROTATED
+    clock.now += 10
+    assert run(store.rotate("fam", "t2", "t3")) == RotationResult.UNKNOWN
+
+
+def test_revoke_family():
+    store = InMemoryTokenFamilyStore()
+    run(store.create_family("fam", "t1", TTL, "user@example.com"))
+    run(store.revoke_family("fam"))
+
+    assert run(store.rotate("fam", "t1", "t2")) == RotationResult.UNKNOWN
+
+
+def test_revoke_subject_revokes_only_that_users_families():
+    store = InMemoryTokenFamilyStore()
+    run(store.create_family("laptop", "a1", TTL, "user@example.com"))
+    run(store.create_family("phone", "b1", TTL, "user@example.com"))
+    run(store.create_family("other", "c1", TTL, "other@example.com"))
+
+    run(store.revoke_subject("user@example.com"))
+
+    assert run(store.rotate("laptop", "a1", "a2")) == RotationResult.UNKNOWN
+    assert run(store.rotate("phone", "b1", "b2")) == RotationResult.UNKNOWN
+    assert run(store.rotate("other", "c1", "c2")) == RotationResult.ROTATED
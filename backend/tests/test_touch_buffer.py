@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.services import touch_buffer as touch_buffer_module
+from app.services.touch_buffer import TouchBuffer
+
+CREATED = datetime(2026, 1, 1)
+
+
+def buffer(max_pending: int = 100, max_size: int = 100) -> TouchBuffer:
+    return TouchBuffer(flush_interval=60, max_pending=max_pending, max_size=max_size)
+
+
+async def create_user(email: str) -> str:
+    async with AsyncSessionLocal() as session:
+        user = User(email=email, full_name="User", created_at=CREATED, updated_at=CREATED)
+        session.add(user)
+        await session.commit()
+        return user.id
+
+
+async def load_user(user_id: str) -> User:
+    async with AsyncSessionLocal() as session:
+        return await session.get(User, user_id)
+
+
+class FailingSession:
+    async def __aenter__(self):
+        await asyncio.sleep(0)
+        raise ConnectionError("database down")
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def test_touches_keep_the_newest_timestamp_per_user_and_column():
+    touches = buffer()
+    now = datetime.utcnow()
+    touches.touch("u1", "last_seen_at", now)
+    touches.touch("u1", "last_seen_at", now - timedelta(seconds=5))
+    touches.touch("u1", "last_login", now)
+
+    assert touches.stats()["pending"] == 2
+    assert touches._pending[("last_seen_at", "u1")][0] == now
+
+
+def test_unknown_column_is_rejected():
+    with pytest.raises(ValueError):
+        buffer().touch("u1", "email")
+
+
+def test_full_buffer_drops_new_users_and_requests_a_flush():
+    touches = buffer(max_pending=2, max_size=2)
+    for user_id in ("u1", "u2", "u3"):
+        touches.touch(user_id)
+
+    assert touches.stats()["pending"] == 2
+    assert touches.dropped == 1
+    assert touches._flush_requested.is_set()
+
+
+def test_flush_writes_timestamps_without_touching_updated_at(run_db):
+    async def scenario():
+        first, second = await create_user("a@example.com"), await create_user("b@example.com")
+        touches = buffer()
+        seen, login = datetime(2026, 5, 1, 12), datetime(2026, 5, 1, 13)
+        touches.touch(first, "last_seen_at", seen)
+        touches.touch(second, "last_login", login)
+
+        assert await touches.flush() == 2
+        return await load_user(first), await load_user(second), touches.stats()
+
+    first, second, stats = run_db(scenario())
+    assert first.last_seen_at == datetime(2026, 5, 1, 12)
+    assert second.last_login == datetime(2026, 5, 1, 13)
+    assert first.updated_at == second.updated_at == CREATED
+    assert stats["pending"] == 0 and stats["rows_flushed"] == 2
+
+
+def test_failed_flush_requeues_the_batch(monkeypatch):
+    touches = buffer()
+    touches.touch("u1", "last_seen_at", datetime(2026, 5, 1))
+    monkeypatch.setattr(touch_buffer_module, "AsyncSessionLocal", FailingSession)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(touches.flush())
+
+    assert touches._pending[("last_seen_at", "u1")][0] == datetime(2026, 5, 1)
+    assert touches.errors == 1
+
+
+def test_requeue_keeps_the_newest_touches_within_the_cap(monkeypatch):
+    touches = buffer(max_size=3)
+    for user_id in ("u1", "u2", "u3"):
+        touches.touch(user_id)
+    monkeypatch.setattr(touch_buffer_module, "AsyncSessionLocal", FailingSession)
+
+    async def scenario():
+        flushing = asyncio.create_task(touches.flush())
+        await asyncio.sleep(0)
+        # The batch is out of the buffer, so new users fit meanwhile
+        touches.touch("u4")
+        touches.touch("u5")
+        with pytest.raises(ConnectionError):
+            await flushing
+
+    asyncio.run(scenario())
+
+    assert sorted(user_id for _, user_id in touches._pending) == ["u3", "u4", "u5"]
+    assert touches.dropped == 2
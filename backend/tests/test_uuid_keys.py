@@ -0,0 +1,56 @@
+import time
+import uuid
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import StatementError
+
+from app.core.database import AsyncSessionLocal
+from app.models.types import new_id, uuid7
+from app.models.user import User
+
+
+def test_uuid7_layout():
+    value = uuid7()
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert abs((value.int >> 80) - time.time_ns() // 1_000_000) < 1000
+
+
+def test_ids_sort_by_creation_time():
+    earlier = new_id()
+    time.sleep(0.002)
+    later = new_id()
+
+    assert earlier < later
+    assert str(uuid.UUID(earlier)) == earlier
+
+
+def test_ids_round_trip_as_strings(run_db):
+    async def scenario():
+        user_id = new_id()
+        async with AsyncSessionLocal() as session:
+            session.add(User(id=user_id, email="user@example.com", full_name="User"))
+            await session.commit()
+
+        async with AsyncSessionLocal() as session:
+            by_string = await session.scalar(select(User.id).where(User.id == user_id))
+            by_uuid = await session.scalar(select(User.id).where(User.id == uuid.UUID(user_id)))
+            stored = await session.scalar(text("SELECT id FROM users"))
+        return user_id, by_string, by_uuid, stored
+
+    user_id, by_string, by_uuid, stored = run_db(scenario())
+    assert by_string == by_uuid == user_id
+    assert isinstance(by_string, str)
+    # 16 raw bytes on SQLite rather than a 36-character string
+    assert stored == uuid.UUID(user_id).bytes
+
+
+def test_malformed_ids_are_rejected(run_db):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            await session.execute(select(User).where(User.id == "not-a-uuid"))
+
+    with pytest.raises(StatementError):
+        run_db(scenario())